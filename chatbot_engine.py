@@ -1,20 +1,192 @@
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+
 from orchestrator.router import route
+from orchestrator import metrics
+from orchestrator.logging_setup import bind, get_logger, new_request_id
+
+log = get_logger("engine")
+
+# Session id used when the caller does not pass one (single-user GUI)
+DEFAULT_SESSION = "default"
+# Turns kept in memory per session (older turns stay in the database)
+MAX_TURNS_PER_SESSION = 20
+# Sessions kept resident before the least recently used one is evicted
+MAX_RESIDENT_SESSIONS = 5000
+# Seconds of inactivity after which a session is evicted
+SESSION_IDLE_TTL = 30 * 60
+
+
+class Turn:
+    """One completed user → bot exchange."""
+
+    __slots__ = ("user", "bot")
+
+    def __init__(self, user: str, bot: str = ""):
+        self.user = user
+        self.bot = bot
+
+    def as_dict(self) -> dict:
+        return {"user": self.user, "bot": self.bot}
+
+
+class Session:
+    __slots__ = ("session_id", "turns", "last_used")
+
+    def __init__(self, session_id, turns=(), max_turns: int = MAX_TURNS_PER_SESSION):
+        self.session_id = session_id
+        self.turns = deque(turns, maxlen=max_turns)
+        self.last_used = time.monotonic()
+
+
+def load_turns_from_db(session_id, limit: int = MAX_TURNS_PER_SESSION) -> list:
+    """
+    Rebuild the latest turns of a session from the `messages` table.
+
+    Replies answer user messages in order, so consecutive user messages (queued
+    sends) are paired first-in first-out; a user message without a reply yet
+    stays as a turn with an empty bot text. A bot message before the first
+    user message of the page lost its question to the page cut and is skipped.
+    """
+    if session_id == DEFAULT_SESSION:
+        return []
+    from database.database_handler import fetch_messages_page  # lazy: engine must not require MySQL
+
+    turns, unanswered = [], deque()
+    # flush=False: this runs on the inference thread and must not wait on the write-behind queue;
+    # a session being (re)loaded is new or idle, so nothing of it is still queued
+    for _id, sender, content, _ts in fetch_messages_page(session_id, limit * 2, flush=False):
+        if sender == "user":
+            turn = Turn(content)
+            turns.append(turn)
+            unanswered.append(turn)
+        elif unanswered:
+            unanswered.popleft().bot = content
+        elif turns:
+            turns[-1].bot = f"{turns[-1].bot}\n{content}"  # a second reply to the same message
+    return turns[-limit:]
+
+
+def deep_sizeof(obj, _seen=None) -> int:
+    """Approximate retained size of `obj` in bytes (containers, slots and strings)."""
+    _seen = _seen if _seen is not None else set()
+    if id(obj) in _seen:
+        return 0
+    _seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k, _seen) + deep_sizeof(v, _seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset, deque)):
+        size += sum(deep_sizeof(item, _seen) for item in obj)
+    elif hasattr(obj, "__slots__"):
+        size += sum(deep_sizeof(getattr(obj, s), _seen) for s in obj.__slots__ if hasattr(obj, s))
+    return size
+
+
+class SessionManager:
+    """
+    LRU/TTL cache of per-session turn buffers keyed by session id.
+    Evicted sessions are rehydrated lazily through `loader` on next access.
+    """
+
+    def __init__(self, max_sessions=MAX_RESIDENT_SESSIONS, idle_ttl=SESSION_IDLE_TTL,
+                 max_turns=MAX_TURNS_PER_SESSION, loader=load_turns_from_db):
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+        self.max_turns = max_turns
+        self.loader = loader
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def get(self, session_id) -> Session:
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is not None:
+                self._sessions.move_to_end(session_id)
+                session.last_used = time.monotonic()
+                metrics.cache_access("sessions", True)
+                return session
+        metrics.cache_access("sessions", False)
+
+        try:
+            turns = self.loader(session_id, self.max_turns) if self.loader else []
+        except Exception:
+            log.exception("rehydrating session %s failed – starting empty", session_id)
+            turns = []
+        with self._lock:
+            # Another thread may have rehydrated it while we were loading
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = self._sessions[session_id] = Session(session_id, turns, self.max_turns)
+            self._sessions.move_to_end(session_id)
+            self._evict_locked()
+        return session
+
+    def drop(self, session_id) -> None:
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def evict_idle(self) -> int:
+        """Evict sessions idle for longer than idle_ttl; returns how many were dropped."""
+        with self._lock:
+            return self._evict_locked()
+
+    def _evict_locked(self) -> int:
+        evicted = 0
+        cutoff = time.monotonic() - self.idle_ttl
+        while self._sessions:
+            oldest_id, oldest = next(iter(self._sessions.items()))
+            if len(self._sessions) <= self.max_sessions and oldest.last_used >= cutoff:
+                break
+            del self._sessions[oldest_id]
+            evicted += 1
+        if evicted:
+            metrics.incr("sessions_evicted", "", evicted)
+        return evicted
+
+    def memory_report(self) -> dict:
+        """Measured bytes held by resident sessions (mean/max per session)."""
+        with self._lock:
+            sizes = [deep_sizeof(s) for s in self._sessions.values()]
+        return {
+            "sessions": len(sizes),
+            "total_bytes": sum(sizes),
+            "mean_bytes": sum(sizes) / len(sizes) if sizes else 0,
+            "max_bytes": max(sizes, default=0),
+        }
+
 
 class MindMateBot:
 
-    def __init__(self):
-        self.history = []  # list of {"user": str, "bot": str}
-        print("[MindMateBot] initialised – history empty")
+    def __init__(self, sessions: SessionManager = None):
+        self.sessions = sessions if sessions is not None else SessionManager()
+        log.info("initialised – history empty")
+
+    @property
+    def history(self) -> list:
+        """Turns of the default session as {"user": str, "bot": str} dicts."""
+        return self.get_history(DEFAULT_SESSION)
+
+    def get_history(self, session_id=DEFAULT_SESSION) -> list:
+        return [t.as_dict() for t in self.sessions.get(session_id).turns]
 
-    def reset(self):
-        self.history.clear()
-        print("[MindMateBot] history reset")
+    def reset(self, session_id=DEFAULT_SESSION):
+        self.sessions.drop(session_id)
+        log.info("history reset")
 
-    def get_reply(self, user_input: str) -> str:
-        print(f"[MindMateBot] USER → {user_input}")
-        self.history.append({"user": user_input, "bot": ""})
+    def get_reply(self, user_input: str, session_id=DEFAULT_SESSION) -> str:
+        with bind(request_id=new_request_id(), session_id=session_id):
+            log.debug("USER → %s", user_input)
+            turn = Turn(user_input)
+            self.sessions.get(session_id).turns.append(turn)
 
-        bot_reply = route(user_input)
-        self.history[-1]["bot"] = bot_reply
-        print(f"[MindMateBot] BOT  → {bot_reply}")
-        return bot_reply
+            with metrics.stage("get_reply"):
+                bot_reply = route(user_input)
+            turn.bot = bot_reply
+            log.debug("BOT  → %s", bot_reply)
+            return bot_reply
@@ -1,98 +1,140 @@
-import pymysql
-import sys
+import threading
+
+from database.storage import ARCHIVE_AFTER_DAYS, DB_CONFIG, PAGE_SIZE, SEARCH_PAGE_SIZE, open_storage  # noqa: F401  (re-exported)
+from database.write_behind import MessageWriter
+from orchestrator.logging_setup import get_logger
+
+log = get_logger("db")
+
+# Seconds a read waits for queued messages before reading without them
+READ_FLUSH_TIMEOUT = 5.0
+
+_storage = None
+_storage_lock = threading.Lock()
+_writer = None
+
+
+def configure_storage(backend=None, **options):
+    """(Re)create the shared storage backend (MINDMATE_DB_BACKEND by default)."""
+    global _storage
+    with _storage_lock:
+        if _storage is not None:
+            _storage.close()
+        _storage = open_storage(backend, **options)
+        return _storage
+
+
+def get_storage():
+    if _storage is None:
+        configure_storage()
+    return _storage
+
+
+def get_pool():
+    return get_storage().pool
 
-# Global connection
-_global_db_connection = None
 
 def get_db_connection():
-    global _global_db_connection
-    print("🔌 [DB] Trying to connect to MySQL...")
-
-    if _global_db_connection is None or not _global_db_connection.open:
-        try:
-            _global_db_connection = pymysql.connect(
-                host="localhost",
-                user="root",
-                password="5284912015",
-                database="mental_health_chatbot",
-                autocommit=True
-            )
-            print("✅ [DB] Connected using PyMySQL.")
-        except pymysql.MySQLError as err:
-            print(f"❌ [DB ERROR] {err}")
-            sys.exit(1)
-    return _global_db_connection
+    """Borrow a pooled connection: `with get_db_connection() as db: ...`"""
+    return get_pool().connection()
+
+
+def pool_stats():
+    return get_storage().stats()
 
 
 def init_schema():
-    print("🛠 [Schema] Creating tables if not exist...")
-    db = get_db_connection()
-    with db.cursor() as cur:
-        # ✅ Updated: sessions now includes title
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS sessions (
-                id INT AUTO_INCREMENT PRIMARY KEY,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                title VARCHAR(255) DEFAULT NULL
-            );
-        """)
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS messages (
-                id INT AUTO_INCREMENT PRIMARY KEY,
-                session_id INT NOT NULL,
-                sender ENUM('user','bot') NOT NULL,
-                content TEXT NOT NULL,
-                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (session_id) REFERENCES sessions(id) ON DELETE CASCADE
-            );
-        """)
-    print("✅ [Schema] Ready.")
+    get_storage().init_schema()
 
 
 def create_session():
-    print("📝 [Session] Inserting new session...")
-    db = get_db_connection()
-    with db.cursor() as cur:
-        cur.execute("INSERT INTO sessions () VALUES ()")
-        cur.execute("SELECT LAST_INSERT_ID()")
-        session_id = cur.fetchone()[0]
-    print(f"✅ [Session] ID = {session_id}")
-    return session_id
+    return get_storage().create_session()
 
 
 def log_message(session_id, sender, content):
-    db = get_db_connection()
-    with db.cursor() as cur:
-        cur.execute(
-            "INSERT INTO messages (session_id, sender, content) VALUES (%s, %s, %s)",
-            (session_id, sender, content)
-        )
-    print(f"✅ [Log] {sender} message saved.")
+    get_storage().log_message(session_id, sender, content)
+
+
+def log_messages_bulk(rows):
+    """Insert [(session_id, sender, content, timestamp), ...] as one batch."""
+    get_storage().log_messages_bulk(rows)
+
+
+def get_message_writer():
+    global _writer
+    with _storage_lock:
+        if _writer is None:
+            _writer = MessageWriter(log_messages_bulk)
+        return _writer
+
+
+def queue_message(session_id, sender, content):
+    """Write-behind variant of log_message: returns immediately, persisted in batches."""
+    get_message_writer().enqueue(session_id, sender, content)
+
+
+def flush_messages(timeout=None):
+    """Wait for queued messages to reach the database (or the journal)."""
+    if _writer is not None:
+        return _writer.flush(timeout)
+    return True
+
+
+def _flush_for_read():
+    """Read-your-writes, bounded: a stuck writer must not hang the read."""
+    if not flush_messages(READ_FLUSH_TIMEOUT):
+        log.warning("write-behind flush timed out after %.0fs – reading without queued messages",
+                    READ_FLUSH_TIMEOUT)
 
 
 def fetch_sessions():
-    db = get_db_connection()
-    with db.cursor() as cur:
-        cur.execute("SELECT id, title, created_at FROM sessions ORDER BY created_at DESC")
-        sessions = cur.fetchall()
-    print(f"✅ [Fetch] {len(sessions)} sessions found.")
-    return sessions
+    return get_storage().fetch_sessions()
+
+
+def fetch_sessions_page(limit=PAGE_SIZE, before=None, after=None):
+    """Newest-first page of (id, title, created_at); keys are (created_at, id)."""
+    return get_storage().fetch_sessions_page(limit, before=before, after=after)
 
 
 def fetch_messages(session_id):
-    db = get_db_connection()
-    with db.cursor() as cur:
-        cur.execute(
-            "SELECT sender, content FROM messages WHERE session_id = %s ORDER BY timestamp",
-            (session_id,)
-        )
-        messages = cur.fetchall()
-    print(f"✅ [Fetch] {len(messages)} messages found.")
-    return messages
+    _flush_for_read()  # read-your-writes for messages still in the write-behind queue
+    return get_storage().fetch_messages(session_id)
+
+
+def fetch_messages_page(session_id, limit=PAGE_SIZE, before=None, after=None, flush=True):
+    """
+    Oldest-first page of (id, sender, content, timestamp); keys are (timestamp, id).
+    flush=False skips waiting for the write-behind queue, for callers that must
+    not block on it (messages queued in the last FLUSH_INTERVAL may be missing).
+    """
+    if flush:
+        _flush_for_read()
+    return get_storage().fetch_messages_page(session_id, limit, before=before, after=after)
 
 
 def update_session_title(session_id, title):
-    db = get_db_connection()
-    with db.cursor() as cur:
-        cur.execute("UPDATE sessions SET title = %s WHERE id = %s", (title, session_id))
-    print(f"📝 [Session] Title updated: {title}")
+    get_storage().update_session_title(session_id, title)
+
+
+def get_session_title(session_id):
+    return get_storage().get_session_title(session_id)
+
+
+def set_title_if_missing(session_id, title):
+    """Title an untitled session with one conditional UPDATE; True if this call set it."""
+    return get_storage().set_title_if_missing(session_id, title)
+
+
+def search_messages(query, limit=SEARCH_PAGE_SIZE, offset=0):
+    """
+    Ranked full-text search: (session_id, title, message_id, sender, snippet, timestamp, score).
+    Archived sessions are not searched until they are opened (rehydrated) again.
+    """
+    _flush_for_read()
+    return get_storage().search_messages(query, limit, offset)
+
+
+def archive_sessions(older_than_days=ARCHIVE_AFTER_DAYS, **options):
+    """Move idle sessions' messages to the archive table; they rehydrate on open."""
+    _flush_for_read()
+    return get_storage().archive_sessions(older_than_days, **options)
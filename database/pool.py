@@ -0,0 +1,194 @@
+"""
+database/pool.py – bounded, thread-safe DB-API connection pool
+
+    pool = ConnectionPool(connect_fn, max_size=8)
+    with pool.connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(...)
+
+* at most `max_size` connections exist; callers wait up to `acquire_timeout`
+  seconds for one and then get PoolTimeout
+* idle connections unused for `health_check_interval` seconds are pinged
+  before being handed out; dead ones are replaced transparently
+* new connections are opened with exponential backoff (`connect_retries`)
+* a connection whose block raised `discard_on` errors is closed, not reused
+
+The pool only needs a zero-argument `connect` callable, so tests can plug in
+any DB-API driver (pymysql against a local MySQL/MariaDB, sqlite3, ...).
+"""
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from orchestrator import metrics
+from orchestrator.logging_setup import get_logger
+
+log = get_logger("db.pool")
+
+
+class PoolTimeout(Exception):
+    """No connection became available within the acquire timeout."""
+
+
+class PoolClosed(Exception):
+    pass
+
+
+def _default_health_check(conn) -> None:
+    ping = getattr(conn, "ping", None)
+    if ping is not None:
+        ping(reconnect=False)          # pymysql
+    else:
+        conn.cursor().execute("SELECT 1")
+
+
+class ConnectionPool:
+    def __init__(self, connect, max_size=8, acquire_timeout=10.0, health_check_interval=30.0,
+                 connect_retries=3, backoff_base=0.2, backoff_max=5.0,
+                 health_check=_default_health_check, discard_on=(Exception,)):
+        self._connect = connect
+        self.max_size = max_size
+        self.acquire_timeout = acquire_timeout
+        self.health_check_interval = health_check_interval
+        self.connect_retries = connect_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._health_check = health_check
+        self.discard_on = discard_on
+
+        self._idle = deque()           # (conn, last_used_monotonic)
+        self._size = 0                 # open connections, idle + in use
+        self._cond = threading.Condition()
+        self._closed = False
+        self._stats = {"created": 0, "discarded": 0, "waits": 0, "wait_ms": 0.0,
+                       "timeouts": 0, "health_checks": 0, "health_failures": 0}
+
+    # ── acquire / release ────────────────────────────────────
+    def acquire(self, timeout=None):
+        timeout = self.acquire_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        waited = False
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise PoolClosed("connection pool is closed")
+                if self._idle:
+                    conn, last_used = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    self._size += 1     # reserve the slot, connect outside the lock
+                    conn, last_used = None, None
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._stats["timeouts"] += 1
+                    metrics.incr("db_pool", "timeouts")
+                    if waited:
+                        self._record_wait(wait_start)
+                    raise PoolTimeout(f"no DB connection free within {timeout:g}s")
+                if not waited:
+                    waited = True
+                    self._stats["waits"] += 1
+                    wait_start = time.monotonic()
+                self._cond.wait(remaining)
+            if waited:
+                self._record_wait(wait_start)
+
+        if conn is None:
+            return self._open_reserved()
+        if time.monotonic() - last_used >= self.health_check_interval and not self._is_healthy(conn):
+            self._close_quietly(conn)
+            with self._cond:
+                self._stats["discarded"] += 1
+            return self._open_reserved()
+        return conn
+
+    def _record_wait(self, wait_start) -> None:
+        # caller holds self._cond
+        wait_ms = (time.monotonic() - wait_start) * 1000.0
+        self._stats["wait_ms"] += wait_ms
+        metrics.observe("db_pool_wait", wait_ms)
+
+    def release(self, conn, broken=False) -> None:
+        with self._cond:
+            if broken or self._closed:
+                self._size -= 1
+                self._stats["discarded"] += 1
+            else:
+                self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+        if broken or self._closed:
+            self._close_quietly(conn)
+
+    @contextmanager
+    def connection(self, timeout=None):
+        conn = self.acquire(timeout)
+        broken = False
+        try:
+            yield conn
+        except self.discard_on:
+            broken = True
+            raise
+        finally:
+            # any exit – other errors, GeneratorExit from an abandoned stream – gives the slot back
+            self.release(conn, broken=broken)
+
+    # ── connect / health ─────────────────────────────────────
+    def _open_reserved(self):
+        """Open a connection for an already-reserved slot, retrying with backoff."""
+        delay = self.backoff_base
+        for attempt in range(1, self.connect_retries + 1):
+            try:
+                conn = self._connect()
+            except Exception as err:
+                if attempt == self.connect_retries:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    log.error("❌ connect failed after %d attempt(s): %s", attempt, err)
+                    raise
+                log.warning("connect attempt %d failed (%s) – retrying in %.1fs", attempt, err, delay)
+                time.sleep(delay)
+                delay = min(delay * 2, self.backoff_max)
+            else:
+                with self._cond:
+                    self._stats["created"] += 1
+                return conn
+
+    def _is_healthy(self, conn) -> bool:
+        with self._cond:
+            self._stats["health_checks"] += 1
+        try:
+            self._health_check(conn)
+            return True
+        except Exception as err:
+            log.info("stale connection dropped: %s", err)
+            with self._cond:
+                self._stats["health_failures"] += 1
+            return False
+
+    @staticmethod
+    def _close_quietly(conn) -> None:
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    # ── lifecycle / metrics ──────────────────────────────────
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            idle, self._idle = list(self._idle), deque()
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for conn, _ in idle:
+            self._close_quietly(conn)
+
+    def stats(self) -> dict:
+        """Pool size, connections in use / idle, waits and cumulative wait time."""
+        with self._cond:
+            idle = len(self._idle)
+            return dict(self._stats, size=self._size, idle=idle,
+                        in_use=self._size - idle, max_size=self.max_size)
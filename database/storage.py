@@ -0,0 +1,737 @@
+"""
+database/storage.py – one chat-history API, two storage engines
+
+    MySQLStorage   the existing pymysql client/server setup, FULLTEXT search
+    SQLiteStorage  embedded file database for single-user desktop installs:
+                   WAL journal, cached (prepared) statements, batched
+                   transactions, FTS5 search; no server, no network round-trips
+
+Both share the queries below; subclasses only supply connections, DDL and
+transaction control. Queries are written with %s placeholders and rewritten
+for drivers using "?". open_storage() picks the engine from
+MINDMATE_DB_BACKEND (mysql | sqlite).
+"""
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from database.pool import ConnectionPool
+from orchestrator.logging_setup import get_logger
+
+log = get_logger("db.storage")
+
+DEFAULT_BACKEND = "mysql"
+# MySQL connection settings (environment overrides the local defaults; the
+# password has no default and must come from MINDMATE_DB_PASSWORD)
+DB_CONFIG = {
+    "host": os.environ.get("MINDMATE_DB_HOST", "localhost"),
+    "port": int(os.environ.get("MINDMATE_DB_PORT", 3306)),
+    "user": os.environ.get("MINDMATE_DB_USER", "root"),
+    "password": os.environ.get("MINDMATE_DB_PASSWORD"),
+    "database": os.environ.get("MINDMATE_DB_NAME", "mental_health_chatbot"),
+}
+# SQLite database file
+SQLITE_PATH = os.environ.get(
+    "MINDMATE_SQLITE_PATH",
+    os.path.join(os.path.dirname(__file__), "mindmate.sqlite3"),
+)
+# Pool sizing
+POOL_SIZE = int(os.environ.get("MINDMATE_DB_POOL_SIZE", 8))
+POOL_ACQUIRE_TIMEOUT = 10.0
+# Default page size for the keyset-paginated fetches
+PAGE_SIZE = 50
+
+# Secondary indexes created by init_schema: (table, name, columns)
+INDEXES = (
+    ("messages", "idx_messages_session_ts", "session_id, timestamp, id"),
+    ("sessions", "idx_sessions_created", "created_at, id"),
+)
+# Search results per page, and the markers wrapped around matched terms in snippets
+SEARCH_PAGE_SIZE = 20
+HIGHLIGHT = ("«", "»")
+SNIPPET_CHARS = 120
+# Column order used by bulk export/import
+TABLE_COLUMNS = {
+    "sessions": ("id", "created_at", "title"),
+    "messages": ("id", "session_id", "sender", "content", "timestamp"),
+}
+# Rows per fetchmany() / executemany() round-trip in bulk transfers
+BULK_BATCH = 5000
+# Archival: sessions idle this many days move to archived_sessions, this many per transaction
+ARCHIVE_AFTER_DAYS = 90
+ARCHIVE_BATCH = 20
+
+# Store datetimes in the same "YYYY-MM-DD HH:MM:SS" text form the column
+# defaults produce, so keyset comparisons stay ordered (and avoid the
+# deprecated default adapters).
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(" "))
+sqlite3.register_converter("TIMESTAMP", lambda raw: datetime.fromisoformat(raw.decode()))
+
+
+def _keyset(order_col, before, after):
+    """WHERE fragment + params for rows strictly before/after an (order_col, id) key."""
+    if before is not None and after is not None:
+        raise ValueError("pass either before or after, not both")
+    key, op = (before, "<") if before is not None else (after, ">")
+    if key is None:
+        return "", ()
+    value, row_id = key
+    return (f" AND ({order_col} {op} %s OR ({order_col} = %s AND id {op} %s))",
+            (value, value, row_id))
+
+
+def _search_terms(query):
+    return re.findall(r"\w+", query.lower())
+
+
+def _snippet(text, terms, width=SNIPPET_CHARS):
+    """Window of `text` around the first matched term, with every term highlighted."""
+    if not terms:
+        return text[:width]
+    pattern = re.compile(r"\b(" + "|".join(map(re.escape, terms)) + r")\w*", re.IGNORECASE)
+    first = pattern.search(text)
+    start = max(0, (first.start() if first else 0) - width // 3)
+    window = text[start:start + width]
+    window = pattern.sub(lambda m: f"{HIGHLIGHT[0]}{m.group(0)}{HIGHLIGHT[1]}", window)
+    return ("…" if start else "") + window + ("…" if start + width < len(text) else "")
+
+
+class Storage:
+    """Chat sessions and messages on top of a pooled DB-API connection."""
+
+    name = "base"
+    paramstyle = "%s"
+    insert_ignore = "INSERT IGNORE"
+    for_update = " FOR UPDATE"
+
+    def __init__(self, **pool_kwargs):
+        pool_kwargs.setdefault("max_size", POOL_SIZE)
+        pool_kwargs.setdefault("acquire_timeout", POOL_ACQUIRE_TIMEOUT)
+        self.pool = ConnectionPool(self.connect, **pool_kwargs)
+        # Session metadata cache: id -> title (None = known untitled); write-through
+        self._titles = {}
+        self._titles_lock = threading.Lock()
+
+    # ── engine specifics ─────────────────────────────────────
+    def connect(self):
+        raise NotImplementedError
+
+    def _create_tables(self, cur) -> None:
+        raise NotImplementedError
+
+    def _ensure_index(self, cur, table, name, columns) -> None:
+        raise NotImplementedError
+
+    def _create_search_index(self, cur) -> None:
+        raise NotImplementedError
+
+    def search_messages(self, query, limit=SEARCH_PAGE_SIZE, offset=0):
+        raise NotImplementedError
+
+    def _streaming_cursor(self, db):
+        """Cursor that fetches rows from the server as they are consumed."""
+        return db.cursor()
+
+    def compact(self) -> None:
+        """Give the space freed by archival back to the filesystem."""
+        raise NotImplementedError
+
+    def _begin(self, db, cur) -> None:
+        raise NotImplementedError
+
+    def _commit(self, db, cur) -> None:
+        db.commit()
+
+    def _rollback(self, db, cur) -> None:
+        db.rollback()
+
+    # ── plumbing ─────────────────────────────────────────────
+    def _sql(self, query):
+        return query if self.paramstyle == "%s" else query.replace("%s", self.paramstyle)
+
+    @contextmanager
+    def cursor(self):
+        """Autocommit cursor on a pooled connection."""
+        with self.pool.connection() as db:
+            cur = db.cursor()
+            try:
+                yield cur
+            finally:
+                cur.close()
+
+    @contextmanager
+    def transaction(self):
+        """Cursor whose statements commit together (or not at all)."""
+        with self.pool.connection() as db:
+            cur = db.cursor()
+            self._begin(db, cur)
+            try:
+                yield cur
+            except BaseException:
+                try:
+                    self._rollback(db, cur)
+                except Exception:
+                    pass  # connection is being discarded anyway
+                raise
+            else:
+                self._commit(db, cur)
+            finally:
+                cur.close()
+
+    def stats(self) -> dict:
+        return dict(self.pool.stats(), backend=self.name)
+
+    def close(self) -> None:
+        self.pool.close()
+
+    # ── bulk transfer ────────────────────────────────────────
+    def stream_table(self, table, batch_size=BULK_BATCH, include_archived=True):
+        """
+        Yield every row of `table` (TABLE_COLUMNS order) in id order, batch by
+        batch. For messages, the rows of archived sessions follow (unpacked,
+        session by session) unless `include_archived` is false.
+        """
+        columns = TABLE_COLUMNS[table]
+        with self.pool.connection() as db:
+            cur = self._streaming_cursor(db)
+            try:
+                cur.execute(f"SELECT {', '.join(columns)} FROM {table} ORDER BY id")
+                while True:
+                    rows = cur.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    yield rows
+            finally:
+                cur.close()
+            if table == "messages" and include_archived:
+                yield from self._stream_archived_messages(db, batch_size)
+
+    def _stream_archived_messages(self, db, batch_size):
+        cur = self._streaming_cursor(db)
+        try:
+            cur.execute("SELECT session_id, payload FROM archived_sessions ORDER BY session_id")
+            batch = []
+            for session_id, payload in iter(cur.fetchone, None):
+                for mid, sender, content, ts in json.loads(zlib.decompress(payload)):
+                    batch.append((mid, session_id, sender, content, datetime.fromisoformat(ts)))
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+            if batch:
+                yield batch
+        finally:
+            cur.close()
+
+    def insert_rows(self, table, rows, skip_existing=True) -> None:
+        """Insert one batch of TABLE_COLUMNS-ordered rows, ids included, in one transaction."""
+        columns = TABLE_COLUMNS[table]
+        verb = self.insert_ignore if skip_existing else "INSERT"
+        placeholders = ", ".join(["%s"] * len(columns))
+        with self.transaction() as cur:
+            cur.executemany(
+                self._sql(f"{verb} INTO {table} ({', '.join(columns)}) VALUES ({placeholders})"),
+                rows
+            )
+        if table == "sessions":
+            with self._titles_lock:
+                self._titles.clear()
+
+    # ── schema ───────────────────────────────────────────────
+    def init_schema(self) -> None:
+        log.info("🛠 Creating tables if not exist...")
+        with self.cursor() as cur:
+            self._create_tables(cur)
+            for table, name, columns in INDEXES:
+                self._ensure_index(cur, table, name, columns)
+            self._create_search_index(cur)
+        log.info("✅ Schema ready.")
+
+    # ── sessions ─────────────────────────────────────────────
+    def create_session(self):
+        log.debug("📝 Inserting new session...")
+        with self.cursor() as cur:
+            cur.execute("INSERT INTO sessions (title) VALUES (NULL)")
+            session_id = cur.lastrowid
+        self._cache_title(session_id, None)
+        log.info("✅ Session created: ID = %s", session_id)
+        return session_id
+
+    def fetch_sessions(self):
+        with self.cursor() as cur:
+            cur.execute("SELECT id, title, created_at FROM sessions ORDER BY created_at DESC, id DESC")
+            sessions = cur.fetchall()
+        with self._titles_lock:
+            self._titles.update((sess_id, title or None) for sess_id, title, _ in sessions)
+        log.debug("✅ %d sessions found.", len(sessions))
+        return sessions
+
+    def fetch_sessions_page(self, limit=PAGE_SIZE, before=None, after=None):
+        """
+        Up to `limit` sessions as (id, title, created_at), newest first.
+        `before` / `after` take the (created_at, id) of a row already shown: older
+        sessions for scrolling down, newer ones for picking up new sessions.
+        """
+        where, params = _keyset("created_at", before, after)
+        newest_first = after is None
+        with self.cursor() as cur:
+            cur.execute(self._sql(
+                "SELECT id, title, created_at FROM sessions WHERE 1 = 1" + where +
+                (" ORDER BY created_at DESC, id DESC" if newest_first else " ORDER BY created_at, id") +
+                " LIMIT %s"),
+                params + (limit,)
+            )
+            sessions = list(cur.fetchall())
+        if not newest_first:
+            sessions.reverse()
+        with self._titles_lock:
+            self._titles.update((sess_id, title or None) for sess_id, title, _ in sessions)
+        log.debug("✅ %d sessions in page.", len(sessions))
+        return sessions
+
+    def update_session_title(self, session_id, title) -> None:
+        with self.cursor() as cur:
+            cur.execute(self._sql("UPDATE sessions SET title = %s WHERE id = %s"), (title, session_id))
+        self._cache_title(session_id, title)
+        log.debug("📝 Session %s title updated: %s", session_id, title)
+
+    def _cache_title(self, session_id, title) -> None:
+        with self._titles_lock:
+            self._titles[session_id] = title or None
+
+    def get_session_title(self, session_id):
+        """Title of one session, from the cache when known (primary-key lookup otherwise)."""
+        with self._titles_lock:
+            if session_id in self._titles:
+                return self._titles[session_id]
+        with self.cursor() as cur:
+            cur.execute(self._sql("SELECT title FROM sessions WHERE id = %s"), (session_id,))
+            row = cur.fetchone()
+        title = row[0] if row else None
+        self._cache_title(session_id, title)
+        return title
+
+    def set_title_if_missing(self, session_id, title) -> bool:
+        """
+        Give an untitled session its title. Returns True if this call set it.
+        Costs nothing once the session is known to be titled; otherwise a single
+        conditional UPDATE, independent of how many sessions exist.
+        """
+        with self._titles_lock:
+            if self._titles.get(session_id):
+                return False
+        with self.cursor() as cur:
+            cur.execute(self._sql(
+                "UPDATE sessions SET title = %s WHERE id = %s AND (title IS NULL OR title = '')"),
+                (title, session_id)
+            )
+            updated = cur.rowcount
+        if updated:
+            self._cache_title(session_id, title)
+            log.debug("📝 Session %s title set: %s", session_id, title)
+            return True
+        with self._titles_lock:
+            self._titles.pop(session_id, None)  # titled elsewhere – reload lazily
+        self.get_session_title(session_id)
+        return False
+
+    # ── messages ─────────────────────────────────────────────
+    def log_message(self, session_id, sender, content) -> None:
+        with self.cursor() as cur:
+            cur.execute(
+                self._sql("INSERT INTO messages (session_id, sender, content) VALUES (%s, %s, %s)"),
+                (session_id, sender, content)
+            )
+        log.debug("✅ %s message saved.", sender)
+
+    def log_messages_bulk(self, rows) -> None:
+        """Insert [(session_id, sender, content, timestamp), ...] in one transaction."""
+        with self.transaction() as cur:
+            cur.executemany(
+                self._sql("INSERT INTO messages (session_id, sender, content, timestamp) "
+                          "VALUES (%s, %s, %s, %s)"),
+                rows
+            )
+
+    def fetch_messages(self, session_id):
+        self.rehydrate(session_id)
+        with self.cursor() as cur:
+            cur.execute(
+                self._sql("SELECT sender, content FROM messages WHERE session_id = %s ORDER BY timestamp, id"),
+                (session_id,)
+            )
+            messages = cur.fetchall()
+        log.debug("✅ %d messages found.", len(messages))
+        return messages
+
+    def fetch_messages_page(self, session_id, limit=PAGE_SIZE, before=None, after=None):
+        """
+        Up to `limit` messages of a session as (id, sender, content, timestamp),
+        oldest first. Without a key this is the latest page; `before` / `after`
+        take the (timestamp, id) of the first / last message already shown.
+        """
+        self.rehydrate(session_id)
+        where, params = _keyset("timestamp", before, after)
+        latest = after is None
+        with self.cursor() as cur:
+            cur.execute(self._sql(
+                "SELECT id, sender, content, timestamp FROM messages WHERE session_id = %s" + where +
+                (" ORDER BY timestamp DESC, id DESC" if latest else " ORDER BY timestamp, id") +
+                " LIMIT %s"),
+                (session_id,) + params + (limit,)
+            )
+            messages = list(cur.fetchall())
+        if latest:
+            messages.reverse()
+        log.debug("✅ %d messages in page.", len(messages))
+        return messages
+
+
+    # ── archival ─────────────────────────────────────────────
+    def archive_sessions(self, older_than_days=ARCHIVE_AFTER_DAYS, batch_size=ARCHIVE_BATCH,
+                         max_batches=None, pause=0.05) -> int:
+        """
+        Move the messages of sessions idle for `older_than_days` into
+        archived_sessions, one zlib-compressed JSON payload per session. The
+        sessions row stays, so the history list is unchanged. Works through
+        the candidates in id order, `batch_size` sessions per short
+        transaction, sleeping `pause` seconds in between so the hot table is
+        never locked for long. Returns the number of sessions archived.
+
+        Archived messages are out of the search index: search_messages only
+        finds them again once the session is opened (rehydrated). Exports
+        still include them (see stream_table).
+        """
+        cutoff = datetime.now().replace(microsecond=0) - timedelta(days=older_than_days)
+        archived, last_id, batches = 0, 0, 0
+        while max_batches is None or batches < max_batches:
+            with self.cursor() as cur:
+                cur.execute(self._sql(
+                    "SELECT s.id FROM sessions s WHERE s.id > %s AND s.created_at < %s "
+                    "AND EXISTS (SELECT 1 FROM messages m WHERE m.session_id = s.id) "
+                    "AND NOT EXISTS (SELECT 1 FROM messages m WHERE m.session_id = s.id AND m.timestamp >= %s) "
+                    "ORDER BY s.id LIMIT %s"),
+                    (last_id, cutoff, cutoff, batch_size)
+                )
+                session_ids = [row[0] for row in cur.fetchall()]
+            if not session_ids:
+                break
+            archived += self._archive_batch(session_ids)
+            last_id = session_ids[-1]
+            batches += 1
+            if pause:
+                time.sleep(pause)
+        log.info("🧊 %d session(s) archived (idle > %d days)", archived, older_than_days)
+        return archived
+
+    def _archive_batch(self, session_ids) -> int:
+        marks = ", ".join(["%s"] * len(session_ids))
+        with self.transaction() as cur:
+            cur.execute(self._sql(
+                f"SELECT session_id, id, sender, content, timestamp FROM messages "
+                f"WHERE session_id IN ({marks}) ORDER BY session_id, timestamp, id" + self.for_update),
+                session_ids
+            )
+            by_session = {}
+            for session_id, *message in cur.fetchall():
+                message[3] = message[3].isoformat(" ")
+                by_session.setdefault(session_id, []).append(message)
+            # A session that got new messages after being archived (without being
+            # opened) is archived again: merge with its existing payload, then replace it
+            ids = list(by_session)
+            if not ids:
+                return 0
+            id_marks = ", ".join(["%s"] * len(ids))
+            cur.execute(self._sql(
+                f"SELECT session_id, payload FROM archived_sessions WHERE session_id IN ({id_marks})"
+                + self.for_update), ids
+            )
+            for session_id, payload in cur.fetchall():
+                merged = {m[0]: m for m in json.loads(zlib.decompress(payload))}
+                merged.update((m[0], m) for m in by_session[session_id])
+                by_session[session_id] = sorted(merged.values(), key=lambda m: (m[3], m[0]))
+            cur.execute(self._sql(f"DELETE FROM archived_sessions WHERE session_id IN ({id_marks})"), ids)
+            cur.executemany(self._sql(
+                "INSERT INTO archived_sessions (session_id, message_count, payload) VALUES (%s, %s, %s)"),
+                [(sid, len(messages), zlib.compress(json.dumps(messages, ensure_ascii=False).encode(), 6))
+                 for sid, messages in by_session.items()]
+            )
+            cur.execute(self._sql(f"DELETE FROM messages WHERE session_id IN ({marks})"), session_ids)
+        log.debug("🧊 archived sessions %s", session_ids)
+        return len(by_session)
+
+    def rehydrate(self, session_id) -> bool:
+        """Move an archived session's messages back into the hot table; True if it was archived."""
+        with self.cursor() as cur:
+            cur.execute(self._sql("SELECT 1 FROM archived_sessions WHERE session_id = %s"), (session_id,))
+            if cur.fetchone() is None:
+                return False
+        with self.transaction() as cur:
+            cur.execute(self._sql(
+                "SELECT payload FROM archived_sessions WHERE session_id = %s" + self.for_update),
+                (session_id,)
+            )
+            row = cur.fetchone()
+            if row is None:
+                return False  # another caller got there first
+            messages = json.loads(zlib.decompress(row[0]))
+            cur.executemany(self._sql(
+                f"{self.insert_ignore} INTO messages (id, session_id, sender, content, timestamp) "
+                "VALUES (%s, %s, %s, %s, %s)"),
+                [(mid, session_id, sender, content, datetime.fromisoformat(ts))
+                 for mid, sender, content, ts in messages]
+            )
+            cur.execute(self._sql("DELETE FROM archived_sessions WHERE session_id = %s"), (session_id,))
+        log.info("♨️ session %s rehydrated (%d messages)", session_id, len(messages))
+        return True
+
+
+class MySQLStorage(Storage):
+    name = "mysql"
+
+    def __init__(self, config=None, **pool_kwargs):
+        import pymysql  # only needed for this backend
+        self._pymysql = pymysql
+        self.config = dict(DB_CONFIG if config is None else config)
+        if self.config.get("password") is None:
+            raise RuntimeError("MySQL backend needs a password: set MINDMATE_DB_PASSWORD "
+                               "(or MINDMATE_DB_BACKEND=sqlite)")
+        pool_kwargs.setdefault("discard_on", (pymysql.OperationalError, pymysql.InterfaceError))
+        super().__init__(**pool_kwargs)
+
+    def connect(self):
+        log.info("🔌 Connecting to MySQL...")
+        conn = self._pymysql.connect(autocommit=True, **self.config)
+        log.info("✅ Connected using PyMySQL.")
+        return conn
+
+    def _create_tables(self, cur) -> None:
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS sessions (
+                id INT AUTO_INCREMENT PRIMARY KEY,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                title VARCHAR(255) DEFAULT NULL
+            );
+        """)
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS messages (
+                id INT AUTO_INCREMENT PRIMARY KEY,
+                session_id INT NOT NULL,
+                sender ENUM('user','bot') NOT NULL,
+                content TEXT NOT NULL,
+                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (session_id) REFERENCES sessions(id) ON DELETE CASCADE
+            );
+        """)
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS archived_sessions (
+                session_id INT PRIMARY KEY,
+                message_count INT NOT NULL,
+                payload LONGBLOB NOT NULL,
+                archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (session_id) REFERENCES sessions(id) ON DELETE CASCADE
+            );
+        """)
+
+    def _ensure_index(self, cur, table, name, columns) -> None:
+        # MySQL has no CREATE INDEX IF NOT EXISTS
+        cur.execute(
+            "SELECT 1 FROM information_schema.statistics "
+            "WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s LIMIT 1",
+            (table, name)
+        )
+        if cur.fetchone() is None:
+            log.info("🛠 Adding index %s on %s(%s)...", name, table, columns)
+            cur.execute(f"CREATE INDEX {name} ON {table} ({columns})")
+
+    def _create_search_index(self, cur) -> None:
+        cur.execute(
+            "SELECT 1 FROM information_schema.statistics WHERE table_schema = DATABASE() "
+            "AND table_name = 'messages' AND index_name = 'ft_messages_content' LIMIT 1"
+        )
+        if cur.fetchone() is None:
+            log.info("🛠 Adding FULLTEXT index on messages(content) – may take a while on big tables...")
+            cur.execute("CREATE FULLTEXT INDEX ft_messages_content ON messages (content)")
+
+    def search_messages(self, query, limit=SEARCH_PAGE_SIZE, offset=0):
+        """
+        Messages matching `query`, best match first, as
+        (session_id, title, message_id, sender, snippet, timestamp, score).
+        Natural-language mode: InnoDB ignores stopwords and words shorter
+        than innodb_ft_min_token_size (3 by default).
+        """
+        terms = _search_terms(query)
+        if not terms:
+            return []
+        text = " ".join(terms)
+        with self.cursor() as cur:
+            cur.execute(
+                "SELECT m.session_id, s.title, m.id, m.sender, m.content, m.timestamp, "
+                "MATCH(m.content) AGAINST (%s IN NATURAL LANGUAGE MODE) AS score "
+                "FROM messages m JOIN sessions s ON s.id = m.session_id "
+                "WHERE MATCH(m.content) AGAINST (%s IN NATURAL LANGUAGE MODE) "
+                "ORDER BY score DESC, m.id DESC LIMIT %s OFFSET %s",
+                (text, text, limit, offset)
+            )
+            rows = cur.fetchall()
+        log.debug("🔎 %d hit(s) for %r", len(rows), query)
+        return [(sid, title, mid, sender, _snippet(content, terms), ts, float(score))
+                for sid, title, mid, sender, content, ts, score in rows]
+
+    def _streaming_cursor(self, db):
+        return db.cursor(self._pymysql.cursors.SSCursor)  # unbuffered, server-side
+
+    def compact(self) -> None:
+        with self.cursor() as cur:
+            cur.execute("OPTIMIZE TABLE messages")  # InnoDB: online table rebuild
+            cur.fetchall()
+
+    def _begin(self, db, cur) -> None:
+        db.begin()
+
+
+class SQLiteStorage(Storage):
+    name = "sqlite"
+    paramstyle = "?"
+    insert_ignore = "INSERT OR IGNORE"
+    for_update = ""  # BEGIN IMMEDIATE already holds the write lock
+
+    def __init__(self, path=SQLITE_PATH, busy_timeout=10.0, **pool_kwargs):
+        self.path = path
+        self.busy_timeout = busy_timeout
+        if path == ":memory:":
+            pool_kwargs["max_size"] = 1  # every connection would get its own database
+        pool_kwargs.setdefault("discard_on", (sqlite3.Error,))
+        super().__init__(**pool_kwargs)
+
+    def connect(self):
+        # isolation_level=None: autocommit, transactions only where _begin() opens one.
+        # cached_statements keeps the compiled form of every query this class issues.
+        conn = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None,
+                               check_same_thread=False, cached_statements=256,
+                               detect_types=sqlite3.PARSE_DECLTYPES)
+        conn.execute("PRAGMA journal_mode = WAL")     # readers never block the writer
+        conn.execute("PRAGMA synchronous = NORMAL")   # fsync at checkpoints, safe under WAL
+        conn.execute("PRAGMA foreign_keys = ON")
+        return conn
+
+    def _create_tables(self, cur) -> None:
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS sessions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                created_at TIMESTAMP NOT NULL DEFAULT (datetime('now', 'localtime')),
+                title VARCHAR(255) DEFAULT NULL
+            );
+        """)
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS messages (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                session_id INTEGER NOT NULL REFERENCES sessions(id) ON DELETE CASCADE,
+                sender TEXT NOT NULL CHECK (sender IN ('user', 'bot')),
+                content TEXT NOT NULL,
+                timestamp TIMESTAMP NOT NULL DEFAULT (datetime('now', 'localtime'))
+            );
+        """)
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS archived_sessions (
+                session_id INTEGER PRIMARY KEY REFERENCES sessions(id) ON DELETE CASCADE,
+                message_count INTEGER NOT NULL,
+                payload BLOB NOT NULL,
+                archived_at TIMESTAMP NOT NULL DEFAULT (datetime('now', 'localtime'))
+            );
+        """)
+
+    def _ensure_index(self, cur, table, name, columns) -> None:
+        cur.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns})")
+
+    def _create_search_index(self, cur) -> None:
+        # External-content FTS5 table: the index only, the text stays in messages.
+        cur.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'messages_fts'")
+        existed = cur.fetchone() is not None
+        cur.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(
+                content, content = 'messages', content_rowid = 'id',
+                tokenize = 'unicode61 remove_diacritics 2'
+            );
+        """)
+        cur.execute("""
+            CREATE TRIGGER IF NOT EXISTS messages_fts_ai AFTER INSERT ON messages BEGIN
+                INSERT INTO messages_fts (rowid, content) VALUES (new.id, new.content);
+            END;
+        """)
+        cur.execute("""
+            CREATE TRIGGER IF NOT EXISTS messages_fts_ad AFTER DELETE ON messages BEGIN
+                INSERT INTO messages_fts (messages_fts, rowid, content) VALUES ('delete', old.id, old.content);
+            END;
+        """)
+        cur.execute("""
+            CREATE TRIGGER IF NOT EXISTS messages_fts_au AFTER UPDATE OF content ON messages BEGIN
+                INSERT INTO messages_fts (messages_fts, rowid, content) VALUES ('delete', old.id, old.content);
+                INSERT INTO messages_fts (rowid, content) VALUES (new.id, new.content);
+            END;
+        """)
+        if not existed:
+            log.info("🛠 Indexing existing messages for search...")
+            cur.execute("INSERT INTO messages_fts (messages_fts) VALUES ('rebuild')")
+
+    def search_messages(self, query, limit=SEARCH_PAGE_SIZE, offset=0):
+        """
+        Messages matching `query`, best match first, as
+        (session_id, title, message_id, sender, snippet, timestamp, score).
+        Any term may match (like MySQL natural-language mode); bm25 ranks
+        messages matching more / rarer terms first. Terms match as prefixes.
+        """
+        terms = _search_terms(query)
+        if not terms:
+            return []
+        match = " OR ".join(f'"{term}"*' for term in terms)
+        with self.cursor() as cur:
+            cur.execute(
+                "SELECT m.session_id, s.title, m.id, m.sender, "
+                "snippet(messages_fts, 0, ?, ?, '…', 16), m.timestamp, -bm25(messages_fts) AS score "
+                "FROM messages_fts JOIN messages m ON m.id = messages_fts.rowid "
+                "JOIN sessions s ON s.id = m.session_id "
+                "WHERE messages_fts MATCH ? ORDER BY bm25(messages_fts), m.id DESC LIMIT ? OFFSET ?",
+                (HIGHLIGHT[0], HIGHLIGHT[1], match, limit, offset)
+            )
+            rows = cur.fetchall()
+        log.debug("🔎 %d hit(s) for %r", len(rows), query)
+        return rows
+
+    def compact(self) -> None:
+        with self.cursor() as cur:
+            cur.execute("VACUUM")
+            cur.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def _begin(self, db, cur) -> None:
+        cur.execute("BEGIN IMMEDIATE")  # take the write lock up front, no upgrade deadlocks
+
+    def _commit(self, db, cur) -> None:
+        cur.execute("COMMIT")
+
+    def _rollback(self, db, cur) -> None:
+        cur.execute("ROLLBACK")
+
+
+BACKENDS = {"mysql": MySQLStorage, "sqlite": SQLiteStorage}
+
+
+def resolve_backend(backend=None) -> str:
+    """Backend name that open_storage(backend) would use."""
+    return (backend or os.environ.get("MINDMATE_DB_BACKEND", DEFAULT_BACKEND)).lower()
+
+
+def open_storage(backend=None, **options) -> Storage:
+    """Instantiate the backend named by `backend` or MINDMATE_DB_BACKEND."""
+    backend = resolve_backend(backend)
+    if backend not in BACKENDS:
+        raise ValueError(f"unknown storage backend {backend!r} (choose from {', '.join(BACKENDS)})")
+    storage = BACKENDS[backend](**options)
+    log.info("🗄 Storage backend: %s", storage.name)
+    return storage
@@ -0,0 +1,256 @@
+"""
+database/write_behind.py – asynchronous, batched message logging
+
+MessageWriter.enqueue() only appends to an in-memory queue; a background
+thread writes the queued rows with one multi-row INSERT when FLUSH_SIZE rows
+are waiting or FLUSH_INTERVAL seconds have passed, whichever comes first.
+
+If the database is unreachable the batch is appended to a local JSONL journal
+instead, and the journal is replayed (oldest first) on the next successful
+flush or the next start. close() – also registered with atexit – drains the
+queue, so a clean shutdown loses nothing.
+
+A journaled row that keeps failing while the database accepts other writes
+(e.g. a foreign-key violation) is moved to a dead-letter file after
+MAX_ATTEMPTS tries, and journal lines that do not parse (a torn last line
+after a crash) are quarantined there too, so neither blocks the journal.
+"""
+
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+
+from orchestrator import metrics
+from orchestrator.logging_setup import get_logger
+
+log = get_logger("db.writer")
+
+# Rows per multi-row INSERT
+FLUSH_SIZE = 64
+# Max seconds a row waits in memory before being written
+FLUSH_INTERVAL = 0.5
+# Rows held in memory before new ones go straight to the journal
+MAX_PENDING = 10_000
+# Where batches go while the database is down
+JOURNAL_PATH = os.environ.get(
+    "MINDMATE_MESSAGE_JOURNAL",
+    os.path.join(os.path.dirname(__file__), "message_journal.jsonl"),
+)
+
+# Failed replays (with the database up) before a journaled row is dead-lettered
+MAX_ATTEMPTS = 5
+# Seconds close() waits to hand the stop marker to a full queue
+STOP_TIMEOUT = 1.0
+
+_STOP = object()
+
+
+def _journal_lines(rows, attempts=None):
+    for i, (session_id, sender, content, ts) in enumerate(rows):
+        rec = {"session_id": session_id, "sender": sender, "content": content, "timestamp": ts.isoformat()}
+        if attempts and attempts[i]:
+            rec["attempts"] = attempts[i]
+        yield json.dumps(rec, ensure_ascii=False) + "\n"
+
+
+class MessageWriter:
+    def __init__(self, write_rows, journal_path=JOURNAL_PATH, flush_size=FLUSH_SIZE,
+                 flush_interval=FLUSH_INTERVAL, max_pending=MAX_PENDING, max_attempts=MAX_ATTEMPTS):
+        """`write_rows(rows)` must insert [(session_id, sender, content, timestamp), ...] in one go."""
+        self._write_rows = write_rows
+        self.journal_path = journal_path
+        self.dead_letter_path = journal_path + ".dead"
+        self.max_attempts = max_attempts
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._journal_lock = threading.Lock()
+        self._idle = threading.Condition()
+        self._unwritten = 0
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="message-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    # ── producer side ────────────────────────────────────────
+    def enqueue(self, session_id, sender, content) -> None:
+        """Queue one message; never touches the database on the caller's thread."""
+        row = (session_id, sender, content, datetime.now())
+        with self._idle:
+            self._unwritten += 1
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            log.warning("write-behind queue full – journaling message directly")
+            self._journal([row])
+            self._done(1)
+
+    def flush(self, timeout=None) -> bool:
+        """Block until everything queued so far has been written or journaled."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._idle:
+            while self._unwritten:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._idle.wait(remaining)
+        return True
+
+    def pending(self) -> int:
+        return self._unwritten
+
+    def close(self, timeout=10.0) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        if not self._thread.is_alive():
+            return
+        try:
+            self._queue.put(_STOP, timeout=STOP_TIMEOUT)
+        except queue.Full:
+            log.warning("write-behind queue still full at close – %d message(s) not drained", self._unwritten)
+            return
+        self._thread.join(timeout)
+
+    # ── background thread ────────────────────────────────────
+    def _run(self) -> None:
+        self._replay_journal(db_up=False)
+        batch, deadline, stopping = [], None, False
+        while not stopping:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+            if item is _STOP:
+                stopping = True
+            elif item is not None:
+                batch.append(item)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+            if batch and (stopping or len(batch) >= self.flush_size or time.monotonic() >= deadline):
+                try:
+                    self._write(batch)
+                except Exception:
+                    # the thread must outlive any one batch, or every later flush() hangs
+                    log.exception("❌ write-behind batch of %d message(s) lost", len(batch))
+                batch, deadline = [], None
+
+    def _write(self, batch) -> None:
+        try:
+            with metrics.stage("db_write_batch"):
+                self._write_rows(batch)
+        except Exception as err:
+            log.error("❌ batch insert failed (%s) – journaling %d message(s)", err, len(batch))
+            self._journal(batch)
+            return
+        finally:
+            self._done(len(batch))
+        log.debug("✅ %d message(s) written", len(batch))
+        self._replay_journal(db_up=True)
+
+    def _done(self, n: int) -> None:
+        with self._idle:
+            self._unwritten -= n
+            if not self._unwritten:
+                self._idle.notify_all()
+
+    # ── journal ──────────────────────────────────────────────
+    def _journal(self, rows) -> None:
+        with self._journal_lock, open(self.journal_path, "a+", encoding="utf-8") as f:
+            if f.tell() and not self._ends_with_newline():
+                f.write("\n")  # don't glue new rows onto a torn last line
+            f.writelines(_journal_lines(rows))
+            f.flush()
+            os.fsync(f.fileno())
+        metrics.incr("db_journaled", "", len(rows))
+
+    def _replay_journal(self, db_up) -> None:
+        """Write journaled rows back to the database, oldest first.
+
+        `db_up` says the database just accepted a write. Only then is a failing
+        chunk retried row by row and each failing row charged an attempt; with
+        the database down the whole journal is simply kept for later.
+        """
+        try:
+            with self._journal_lock:
+                if os.path.exists(self.journal_path):
+                    self._replay_locked(db_up)
+        except Exception:
+            log.exception("❌ journal replay failed")
+
+    def _replay_locked(self, db_up) -> None:
+        rows, attempts, torn = [], [], []
+        with open(self.journal_path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    r = json.loads(line)
+                    rows.append((r["session_id"], r["sender"], r["content"],
+                                 datetime.fromisoformat(r["timestamp"])))
+                    attempts.append(r.get("attempts", 0))
+                except (ValueError, KeyError, TypeError):
+                    torn.append(line if line.endswith("\n") else line + "\n")
+        if torn:
+            log.warning("📒 %d unreadable journal line(s) moved to %s", len(torn), self.dead_letter_path)
+            self._append(self.dead_letter_path, torn)
+
+        kept, kept_attempts, dead, written = [], [], [], 0
+        for start in range(0, len(rows), self.flush_size):
+            chunk = rows[start:start + self.flush_size]
+            try:
+                self._write_rows(chunk)
+                written += len(chunk)
+                db_up = True
+                continue
+            except Exception as err:
+                if not db_up:
+                    log.warning("journal replay deferred: %s", err)
+                    kept += rows[start:]
+                    kept_attempts += attempts[start:]
+                    break
+            for row, tries in zip(chunk, attempts[start:start + len(chunk)]):
+                try:
+                    self._write_rows([row])
+                    written += 1
+                except Exception as err:
+                    tries += 1
+                    if tries >= self.max_attempts:
+                        log.error("❌ journaled message for session %s failed %d times (%s) – dead-lettered",
+                                  row[0], tries, err)
+                        dead.append(row)
+                    else:
+                        kept.append(row)
+                        kept_attempts.append(tries)
+
+        if dead:
+            self._append(self.dead_letter_path, list(_journal_lines(dead)))
+        if kept:
+            self._rewrite_journal(kept, kept_attempts)
+        else:
+            os.remove(self.journal_path)
+        if written:
+            log.info("📒 replayed %d journaled message(s)", written)
+
+    def _ends_with_newline(self) -> bool:
+        with open(self.journal_path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    @staticmethod
+    def _append(path, lines) -> None:
+        with open(path, "a", encoding="utf-8") as f:
+            f.writelines(lines)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _rewrite_journal(self, rows, attempts=None) -> None:
+        tmp_path = self.journal_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.writelines(_journal_lines(rows, attempts))
+        os.replace(tmp_path, self.journal_path)
@@ -1,24 +1,32 @@
+import itertools
 import sys
+from datetime import datetime
 from PyQt5 import QtWidgets, QtCore, QtGui
 from PyQt5.QtWidgets import QMessageBox
 from gui.main_window_ui import Ui_MainWindow
+from gui.sidebar import SIDEBAR_PAGE, SessionListModel
+from gui.transcript import TRANSCRIPT_PAGE, TranscriptModel, TranscriptView
+from gui.workers import db_pool, inference_pool, submit, wait_all
 
 #from chatbot.rule_based_chatbot import generate_bot_reply
 from chatbot_engine import MindMateBot
+from orchestrator.logging_setup import bind, get_logger
 from database.database_handler import (
     init_schema,
     create_session,
-    log_message,
-    fetch_sessions,
-    fetch_messages,
-    update_session_title
+    queue_message,
+    fetch_sessions_page,
+    fetch_messages_page,
+    set_title_if_missing
 )
 
+log = get_logger("gui")
+
 
 class ChatWindow(QtWidgets.QMainWindow):
     def __init__(self):
         super().__init__()
-        print("🚀 Launching Application...")
+        log.info("🚀 Launching Application...")
         self.ui = Ui_MainWindow()
         self.ui.setupUi(self)
 
@@ -34,148 +42,228 @@ class ChatWindow(QtWidgets.QMainWindow):
             layout.addWidget(self.ui.historyList)
             self.ui.widget.setLayout(layout)
 
-        self.chatContentWidget = QtWidgets.QWidget()
-        self.messagesLayout = QtWidgets.QVBoxLayout(self.chatContentWidget)
-        self.messagesLayout.setAlignment(QtCore.Qt.AlignTop)
+        # Sidebar: a list view over an incremental session model replaces historyList
+        self.sessionModel = SessionListModel(self)
+        self.sessionList = QtWidgets.QListView(self.ui.widget)
+        self.sessionList.setObjectName("historyList")
+        self.sessionList.setModel(self.sessionModel)
+        self.sessionList.setUniformItemSizes(True)
+        self.sessionList.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        self.ui.widget.layout().replaceWidget(self.ui.historyList, self.sessionList)
+        self.ui.historyList.deleteLater()
+        self.sessionModel.olderRequested.connect(self.load_older_sessions)
 
-        try:
-            self.ui.scrollArea.takeWidget()
-            self.ui.scrollArea.setWidget(self.chatContentWidget)
-            self.ui.scrollArea.setWidgetResizable(True)
-        except Exception as e:
-            self.show_error("ScrollArea Error", str(e))
+        # Transcript: a virtualized list view in place of the designer's scroll area
+        self.transcriptModel = TranscriptModel(self)
+        self.transcript = TranscriptView(self.ui.widget_2)
+        self.transcript.setModel(self.transcriptModel)
+        self.ui.verticalLayout_2.replaceWidget(self.ui.scrollArea, self.transcript)
+        self.ui.scrollArea.deleteLater()
+        self.transcript.olderRequested.connect(self.load_older_messages)
+
+        # Cancels the reply being generated for the current session
+        self.stopButton = QtWidgets.QPushButton("Stop", self.ui.widget_2)
+        self.stopButton.hide()
+        self.ui.horizontalLayout.addWidget(self.stopButton)
+        self.stopButton.clicked.connect(self.cancel_reply)
+        QtWidgets.QShortcut(QtGui.QKeySequence(QtCore.Qt.Key_Escape), self, activated=self.cancel_reply)
+        QtWidgets.QShortcut(QtGui.QKeySequence.Refresh, self, activated=self.refresh_history_list)
+        QtWidgets.QShortcut(QtGui.QKeySequence.New, self, activated=self.new_session)
 
         self.bot = MindMateBot()
+        self.current_session = None
+        self._reply_seq = itertools.count(1)
+        self._pending_replies = {}   # seq -> (session_id, task); popped when shown or cancelled
+        self._load_seq = 0           # bumps on every session switch; stale page loads are dropped
+        self._loading_older = False
+        self.ui.pushButton.setEnabled(False)  # until the session exists
 
         self.ui.pushButton.clicked.connect(self.send_message)
         self.ui.lineEdit.returnPressed.connect(self.send_message)
-        self.ui.historyList.itemClicked.connect(self.on_history_clicked)
+        self.sessionList.clicked.connect(self.on_history_clicked)
 
     def initialize_database_safely(self):
-        print("🛠 [DB] Initializing schema and session...")
-        try:
-            init_schema()
-            self.current_session = create_session()
-            print(f"✅ [DB] Session created: ID {self.current_session}")
-            self.refresh_history_list()
-        except Exception as e:
-            self.show_error("Database Initialization Error", str(e))
+        log.info("🛠 Initializing schema and session...")
+        submit(db_pool(), self._init_database, on_done=self._on_database_ready,
+               on_error=lambda e: self.show_error("Database Initialization Error", str(e)))
+
+    @staticmethod
+    def _init_database():
+        init_schema()
+        return create_session()
+
+    def _on_database_ready(self, session_id):
+        if self.current_session is None:  # the user may already have picked a session
+            self.current_session = session_id
+        log.info("✅ Session created: ID %s", session_id)
+        self.ui.pushButton.setEnabled(True)
+        self.refresh_history_list()
 
     def send_message(self):
         text = self.ui.lineEdit.text().strip()
-        if not text:
+        if not text or self.current_session is None:
             return
         self.ui.lineEdit.clear()
         self.display_message(text, is_user=True)
 
-        print(f"🧾 Logging to session {self.current_session}")
-        try:
-            log_message(self.current_session, 'user', text)
-
-            sessions = fetch_sessions()
-            for sess_id, title, _ in sessions:
-                if sess_id == self.current_session and (title is None or title.strip() == ""):
-                    update_session_title(self.current_session, text[:50])
-                    print(f"✍️ [Title Set] Session {sess_id} → {text[:50]}")
-                    self.refresh_history_list()
-                    break
+        with bind(session_id=self.current_session):
+            self._handle_user_text(self.current_session, text)
 
+    def _handle_user_text(self, session_id, text):
+        log.debug("🧾 Logging to session %s", session_id)
+        try:
+            queue_message(session_id, 'user', text)  # write-behind: never blocks
         except Exception as e:
             self.show_error("Logging User Message Failed", str(e))
 
+        title = text[:50]
+        submit(db_pool(), set_title_if_missing, session_id, title,
+               on_done=lambda updated: updated and self.sessionModel.update_title(session_id, title),
+               on_error=lambda e: self.show_error("Setting Session Title Failed", str(e)))
+
+        # One inference thread: replies are produced in the order they were asked for
+        seq = next(self._reply_seq)
+        task = submit(inference_pool(), self._generate_reply, seq, session_id, text,
+                      on_done=self._on_reply)
+        self._pending_replies[seq] = (session_id, task)
+        self._update_typing()
+
+    def _generate_reply(self, seq, session_id, text):
+        """Runs on the inference thread."""
         try:
-            reply = self.bot.get_reply(text)
+            reply = self.bot.get_reply(text, session_id=session_id)
             #reply = generate_bot_reply(text)
-
         except Exception as e:
             reply = f"[Bot error: {e}]"
+        return seq, session_id, reply
 
-        self.display_message(reply, is_user=False)
-
+    def _on_reply(self, result):
+        seq, session_id, reply = result
+        if self._pending_replies.pop(seq, None) is None:
+            log.debug("🗑 Discarded cancelled reply %d for session %s", seq, session_id)
+            return
         try:
-            log_message(self.current_session, 'bot', reply)
+            queue_message(session_id, 'bot', reply)
         except Exception as e:
             self.show_error("Logging Bot Message Failed", str(e))
+        if session_id == self.current_session:
+            self.display_message(reply, is_user=False)
+        self._update_typing()
 
-    def display_message(self, text, is_user=True):
-        bubble = QtWidgets.QLabel(text)
-        bubble.setWordWrap(True)
-        bubble.setMaximumWidth(400)
-        bubble.setStyleSheet(f"""
-            QLabel {{
-                background-color: {'#cce5ff' if is_user else '#f0f0f0'};
-                border-radius: 12px;
-                padding: 10px;
-                font-size: 14px;
-                color: #2e2e2e;
-            }}
-        """)
-        hbox = QtWidgets.QHBoxLayout()
-        if is_user:
-            hbox.addStretch()
-            hbox.addWidget(bubble)
+    def cancel_reply(self):
+        """Drop the current session's pending replies; ones not started never run."""
+        for seq, (session_id, task) in list(self._pending_replies.items()):
+            if session_id == self.current_session:
+                task.cancelled = True
+                del self._pending_replies[seq]
+                log.debug("✋ Reply %d for session %s cancelled", seq, session_id)
+        self._update_typing()
+
+    def _update_typing(self):
+        typing = any(session_id == self.current_session for session_id, _ in self._pending_replies.values())
+        self.stopButton.setVisible(typing)
+        if typing:
+            self.statusBar().showMessage("MindMate is typing…")
         else:
-            hbox.addWidget(bubble)
-            hbox.addStretch()
-        self.messagesLayout.addLayout(hbox)
+            self.statusBar().clearMessage()
+
+    def display_message(self, text, is_user=True):
+        self.transcriptModel.append_message('user' if is_user else 'bot', text)
         self.scroll_to_bottom()
 
     def scroll_to_bottom(self):
-        self.ui.scrollArea.verticalScrollBar().setValue(
-            self.ui.scrollArea.verticalScrollBar().maximum()
-        )
+        self.transcript.scrollToBottom()
 
     def clear_chat_display(self):
-        while self.messagesLayout.count():
-            item = self.messagesLayout.takeAt(0)
-            if item.widget():
-                item.widget().deleteLater()
-            elif item.layout():
-                layout = item.layout()
-                for i in reversed(range(layout.count())):
-                    subitem = layout.takeAt(i)
-                    if subitem.widget():
-                        subitem.widget().deleteLater()
-                layout.deleteLater()
+        self.transcriptModel.clear()
 
     def refresh_history_list(self):
-        print("📜 [History] Fetching sessions...")
-        self.ui.historyList.clear()
-        try:
-            db_sessions = fetch_sessions()
-        except Exception as e:
-            self.show_error("Fetching Sessions Failed", str(e))
-            return
+        """Full sidebar reload (startup / F5); everything else is applied as a diff."""
+        log.debug("📜 Fetching sessions...")
+        submit(db_pool(), fetch_sessions_page, SIDEBAR_PAGE, on_done=self._fill_history_list,
+               on_error=lambda e: self.show_error("Fetching Sessions Failed", str(e)))
+
+    def _fill_history_list(self, db_sessions):
+        self.sessionModel.reset(db_sessions, has_more=len(db_sessions) == SIDEBAR_PAGE)
+        log.debug("✅ %d session(s) loaded.", len(db_sessions))
 
-        for sess_id, title, ts in db_sessions:
-            label = title if title else ts.strftime("%Y-%m-%d %H:%M:%S")
-            print(f"📌 Session {sess_id} → Label: {label}")
-            item = QtWidgets.QListWidgetItem(label)
-            item.setData(QtCore.Qt.UserRole, sess_id)
-            self.ui.historyList.addItem(item)
-        print(f"✅ [History] {len(db_sessions)} session(s) loaded.")
+    def load_older_sessions(self, before):
+        submit(db_pool(), fetch_sessions_page, SIDEBAR_PAGE, before=before,
+               on_done=lambda page: self.sessionModel.append_page(page, has_more=len(page) == SIDEBAR_PAGE),
+               on_error=self._older_sessions_failed)
 
-    def on_history_clicked(self, item: QtWidgets.QListWidgetItem):
-        sess_id = item.data(QtCore.Qt.UserRole)
-        print(f"🖱️ [History Clicked] Selected session ID: {sess_id}")
+    def _older_sessions_failed(self, e):
+        self.sessionModel.page_failed()
+        self.show_error("Fetching Sessions Failed", str(e))
+
+    def new_session(self):
+        submit(db_pool(), create_session, on_done=self._on_session_created,
+               on_error=lambda e: self.show_error("Creating Session Failed", str(e)))
+
+    def _on_session_created(self, sess_id):
+        log.info("✅ Session created: ID %s", sess_id)
+        self.sessionModel.insert_session(sess_id, None, datetime.now())
+        index = self.sessionModel.index(self.sessionModel.row_of(sess_id))
+        self.sessionList.setCurrentIndex(index)
+        self.on_history_clicked(index)
+
+    def on_history_clicked(self, index: QtCore.QModelIndex):
+        sess_id = index.data(QtCore.Qt.UserRole)
+        log.debug("🖱️ Selected session ID: %s", sess_id)
 
         self.clear_chat_display()
-        try:
-            messages = fetch_messages(sess_id)
-            print(f"📥 [DB] Retrieved {len(messages)} messages for session {sess_id}")
-            for sender, content in messages:
-                self.display_message(content, is_user=(sender == 'user'))
-            self.current_session = sess_id
-            print(f"✅ [GUI] Displayed all messages from session {sess_id}")
-        except Exception as e:
-            self.show_error("Loading Session Messages Failed", str(e))
+        self.current_session = sess_id
+        self.ui.pushButton.setEnabled(True)
+        self._load_seq += 1
+        self._loading_older = False
+        self._update_typing()
+        token = self._load_seq
+        submit(db_pool(), fetch_messages_page, sess_id, TRANSCRIPT_PAGE,
+               on_done=lambda messages: self._show_latest_page(token, sess_id, messages),
+               on_error=lambda e: self.show_error("Loading Session Messages Failed", str(e)))
+
+    def _show_latest_page(self, token, sess_id, messages):
+        if token != self._load_seq:
+            return  # another session was selected meanwhile
+        log.debug("📥 Retrieved %d messages for session %s", len(messages), sess_id)
+        self.transcriptModel.reset(messages, has_more=len(messages) == TRANSCRIPT_PAGE)
+        self.scroll_to_bottom()
+        log.debug("✅ Displayed latest messages from session %s", sess_id)
+
+    def load_older_messages(self):
+        before = self.transcriptModel.oldest_key()
+        if before is None or self._loading_older:
+            return
+        self._loading_older = True
+        token = self._load_seq
+        submit(db_pool(), fetch_messages_page, self.current_session, TRANSCRIPT_PAGE, before=before,
+               on_done=lambda messages: self._show_older_page(token, messages),
+               on_error=self._older_page_failed)
+
+    def _show_older_page(self, token, messages):
+        if token != self._load_seq:
+            return
+        self._loading_older = False
+        log.debug("📥 %d older message(s) for session %s", len(messages), self.current_session)
+        self.transcript.prepend(messages, has_more=len(messages) == TRANSCRIPT_PAGE)
+
+    def _older_page_failed(self, e):
+        self._loading_older = False
+        self.transcriptModel.has_more = False
+        self.show_error("Loading Older Messages Failed", str(e))
+
+    def closeEvent(self, event):
+        wait_all()
+        super().closeEvent(event)
 
     def show_error(self, title, message):
-        print(f"❌ [{title}] {message}")
+        log.error("❌ [%s] %s", title, message)
         QMessageBox.critical(self, title, message)
 
 
 if __name__ == "__main__":
+    from orchestrator import threads
+    threads.apply("interactive")
     app = QtWidgets.QApplication(sys.argv)
     window = ChatWindow()
     window.show()
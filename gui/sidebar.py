@@ -0,0 +1,105 @@
+"""
+gui/sidebar.py – session history sidebar backed by an incremental model
+
+SessionListModel holds the sessions loaded so far, newest first, and changes
+by diffs only: insert_session() puts a new session on top, update_title()
+repaints one row, append_page() adds an older page at the bottom. Qt asks
+for that page through canFetchMore()/fetchMore() when the list is scrolled
+to the end; the model answers by emitting `olderRequested` and the window
+loads it off the UI thread. reset() – a full reload – is for startup and
+explicit refresh only.
+"""
+
+from PyQt5 import QtCore
+
+# Sessions per page in the sidebar
+SIDEBAR_PAGE = 50
+LABEL_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+class SessionListModel(QtCore.QAbstractListModel):
+    """Rows are (session_id, title, created_at) from fetch_sessions_page."""
+
+    olderRequested = QtCore.pyqtSignal(object)  # keyset cursor (created_at, id)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows = []
+        self._pos = {}   # session_id -> position; row = position - self._top
+        self._top = 0
+        self.has_more = False
+        self._loading = False
+
+    # ── Qt model API ─────────────────────────────────────────
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        session_id, title, created_at = self._rows[index.row()]
+        if role == QtCore.Qt.DisplayRole:
+            return title if title else created_at.strftime(LABEL_TIME_FORMAT)
+        if role == QtCore.Qt.UserRole:
+            return session_id
+        return None
+
+    def canFetchMore(self, parent=QtCore.QModelIndex()):
+        return not parent.isValid() and self.has_more and not self._loading
+
+    def fetchMore(self, parent=QtCore.QModelIndex()):
+        if not self.canFetchMore(parent) or not self._rows:
+            return
+        self._loading = True
+        session_id, _, created_at = self._rows[-1]
+        self.olderRequested.emit((created_at, session_id))
+
+    # ── diffs ────────────────────────────────────────────────
+    def reset(self, sessions, has_more):
+        self.beginResetModel()
+        self._rows = list(sessions)
+        self._top = 0
+        self._pos = {row[0]: i for i, row in enumerate(self._rows)}
+        self.has_more = has_more
+        self._loading = False
+        self.endResetModel()
+
+    def append_page(self, sessions, has_more):
+        self._loading = False
+        self.has_more = has_more
+        sessions = [row for row in sessions if row[0] not in self._pos]
+        if not sessions:
+            return
+        first = len(self._rows)
+        self.beginInsertRows(QtCore.QModelIndex(), first, first + len(sessions) - 1)
+        for row in sessions:
+            self._pos[row[0]] = self._top + len(self._rows)
+            self._rows.append(row)
+        self.endInsertRows()
+
+    def page_failed(self):
+        self._loading = False
+        self.has_more = False
+
+    def insert_session(self, session_id, title, created_at):
+        if session_id in self._pos:
+            return self.update_title(session_id, title)
+        self.beginInsertRows(QtCore.QModelIndex(), 0, 0)
+        self._top -= 1
+        self._pos[session_id] = self._top
+        self._rows.insert(0, (session_id, title, created_at))
+        self.endInsertRows()
+
+    def update_title(self, session_id, title):
+        position = self._pos.get(session_id)
+        if position is None:
+            return  # not paged in yet; it will load with its title
+        row = position - self._top
+        _, _, created_at = self._rows[row]
+        self._rows[row] = (session_id, title, created_at)
+        index = self.index(row)
+        self.dataChanged.emit(index, index, [QtCore.Qt.DisplayRole])
+
+    def row_of(self, session_id):
+        position = self._pos.get(session_id)
+        return None if position is None else position - self._top
@@ -0,0 +1,193 @@
+"""
+gui/transcript.py – virtualized chat transcript (model/view)
+
+TranscriptModel holds the loaded messages as plain tuples; TranscriptView is
+a QListView that paints them as bubbles through BubbleDelegate, so only the
+rows on screen are ever drawn and no widget exists per message. Scrolling
+near the top emits `olderRequested`; the window answers with the previous
+page from the database and prepend() keeps the viewport where it was.
+"""
+
+from collections import OrderedDict
+
+from PyQt5 import QtCore, QtGui, QtWidgets
+
+# Messages fetched per page when opening a session / scrolling up
+TRANSCRIPT_PAGE = 50
+# Ask for older messages when the scrollbar is this many pixels from the top
+LOAD_OLDER_MARGIN = 120
+# Wrapped text sizes kept by the delegate (least recently used dropped first)
+TEXT_SIZE_CACHE = 2_000
+
+MAX_BUBBLE_WIDTH = 400
+BUBBLE_PADDING = 10
+BUBBLE_RADIUS = 12
+ROW_SPACING = 6
+USER_COLOR = "#cce5ff"
+BOT_COLOR = "#f0f0f0"
+TEXT_COLOR = "#2e2e2e"
+FONT_PIXEL_SIZE = 14
+
+IsUserRole = QtCore.Qt.UserRole + 1
+KeyRole = QtCore.Qt.UserRole + 2
+
+
+class TranscriptModel(QtCore.QAbstractListModel):
+    """Rows are (message_id, sender, content, timestamp); live messages have no id yet."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows = []
+        self.has_more = False  # older messages left in the database
+
+    # ── Qt model API ─────────────────────────────────────────
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        message_id, sender, content, timestamp = self._rows[index.row()]
+        if role == QtCore.Qt.DisplayRole:
+            return content
+        if role == IsUserRole:
+            return sender == "user"
+        if role == KeyRole:
+            return (timestamp, message_id) if message_id is not None else None
+        return None
+
+    # ── loading ──────────────────────────────────────────────
+    def reset(self, messages, has_more=False):
+        self.beginResetModel()
+        self._rows = list(messages)
+        self.has_more = has_more
+        self.endResetModel()
+
+    def clear(self):
+        self.reset([])
+
+    def prepend(self, messages, has_more):
+        self.has_more = has_more
+        if not messages:
+            return
+        self.beginInsertRows(QtCore.QModelIndex(), 0, len(messages) - 1)
+        self._rows[:0] = messages
+        self.endInsertRows()
+
+    def append_message(self, sender, content):
+        row = len(self._rows)
+        self.beginInsertRows(QtCore.QModelIndex(), row, row)
+        self._rows.append((None, sender, content, None))
+        self.endInsertRows()
+
+    def oldest_key(self):
+        """(timestamp, id) of the first row, the keyset cursor for the previous page."""
+        if not self._rows or self._rows[0][0] is None:
+            return None
+        message_id, _, _, timestamp = self._rows[0]
+        return (timestamp, message_id)
+
+
+class BubbleDelegate(QtWidgets.QStyledItemDelegate):
+    """Paints one message as a rounded bubble, right-aligned for the user."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._font = QtGui.QFont()
+        self._font.setPixelSize(FONT_PIXEL_SIZE)
+        self._metrics = QtGui.QFontMetrics(self._font)
+        # (content, max text width) -> QSize, LRU-capped; wrapping is the costly part
+        self._text_sizes = OrderedDict()
+
+    def _text_size(self, text, width, cache=True):
+        key = (text, width)
+        size = self._text_sizes.get(key)
+        if size is not None:
+            self._text_sizes.move_to_end(key)
+            return size
+        size = self._metrics.boundingRect(QtCore.QRect(0, 0, width, 0), QtCore.Qt.TextWordWrap, text).size()
+        if cache:
+            self._text_sizes[key] = size
+            if len(self._text_sizes) > TEXT_SIZE_CACHE:
+                self._text_sizes.popitem(last=False)
+        return size
+
+    def _max_text_width(self, option):
+        return max(40, min(MAX_BUBBLE_WIDTH, option.rect.width() - 2 * ROW_SPACING) - 2 * BUBBLE_PADDING)
+
+    def clear_cache(self):
+        self._text_sizes.clear()
+
+    def sizeHint(self, option, index):
+        text = index.data(QtCore.Qt.DisplayRole) or ""
+        # before the view is laid out the width is meaningless: measure, don't cache
+        size = self._text_size(text, self._max_text_width(option), cache=option.rect.width() > 0)
+        return QtCore.QSize(option.rect.width(), size.height() + 2 * BUBBLE_PADDING + ROW_SPACING)
+
+    def paint(self, painter, option, index):
+        text = index.data(QtCore.Qt.DisplayRole) or ""
+        is_user = index.data(IsUserRole)
+        size = self._text_size(text, self._max_text_width(option))
+        bubble = QtCore.QRect(0, 0, size.width() + 2 * BUBBLE_PADDING, size.height() + 2 * BUBBLE_PADDING)
+        top = option.rect.top() + ROW_SPACING // 2
+        if is_user:
+            bubble.moveTopRight(QtCore.QPoint(option.rect.right() - ROW_SPACING, top))
+        else:
+            bubble.moveTopLeft(QtCore.QPoint(option.rect.left() + ROW_SPACING, top))
+
+        painter.save()
+        painter.setRenderHint(QtGui.QPainter.Antialiasing)
+        painter.setPen(QtCore.Qt.NoPen)
+        painter.setBrush(QtGui.QColor(USER_COLOR if is_user else BOT_COLOR))
+        painter.drawRoundedRect(bubble, BUBBLE_RADIUS, BUBBLE_RADIUS)
+        painter.setPen(QtGui.QColor(TEXT_COLOR))
+        painter.setFont(self._font)
+        painter.drawText(bubble.adjusted(BUBBLE_PADDING, BUBBLE_PADDING, -BUBBLE_PADDING, -BUBBLE_PADDING),
+                         QtCore.Qt.TextWordWrap, text)
+        painter.restore()
+
+
+class TranscriptView(QtWidgets.QListView):
+    olderRequested = QtCore.pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.bubbles = BubbleDelegate(self)
+        self.setItemDelegate(self.bubbles)
+        self.setSelectionMode(QtWidgets.QAbstractItemView.NoSelection)
+        self.setFocusPolicy(QtCore.Qt.NoFocus)
+        self.setVerticalScrollMode(QtWidgets.QAbstractItemView.ScrollPerPixel)
+        self.setHorizontalScrollBarPolicy(QtCore.Qt.ScrollBarAlwaysOff)
+        self.setResizeMode(QtWidgets.QListView.Adjust)  # re-wrap bubbles on resize
+        self.setStyleSheet("QListView { background: white; border: none; }")
+        self.verticalScrollBar().valueChanged.connect(self._on_scroll)
+        self._anchor = None  # distance from the bottom to restore after a prepend
+
+    def setModel(self, model):
+        super().setModel(model)
+        if model is not None:
+            # reset()/clear() on a session switch: the old session's sizes are dead weight
+            model.modelReset.connect(self.bubbles.clear_cache)
+
+    def _on_scroll(self, value):
+        model = self.model()
+        if self._anchor is None and model is not None and model.has_more and value <= LOAD_OLDER_MARGIN:
+            self.olderRequested.emit()
+
+    def prepend(self, messages, has_more):
+        """Insert an older page above the current rows without moving the viewport."""
+        bar = self.verticalScrollBar()
+        self._anchor = bar.maximum() - bar.value()
+        self.model().prepend(messages, has_more)
+        self.doItemsLayout()
+        QtCore.QTimer.singleShot(0, self._restore_anchor)
+
+    def _restore_anchor(self):
+        bar = self.verticalScrollBar()
+        bar.setValue(bar.maximum() - self._anchor)
+        self._anchor = None
+
+    def resizeEvent(self, event):
+        if event.size().width() != event.oldSize().width():
+            self.bubbles.clear_cache()
+        super().resizeEvent(event)
@@ -0,0 +1,91 @@
+"""
+gui/workers.py – run blocking calls off the Qt main thread
+
+    task = submit(db_pool(), fetch_messages_page, sess_id, 50,
+                  on_done=self._show_page, on_error=self._load_failed)
+
+Two pools:
+    db_pool()         a few threads for database calls
+    inference_pool()  one thread for bot replies, so replies are produced
+                      strictly in the order they were requested
+
+Results come back through Qt signals delivered on the main thread; the
+caller's logging context (request/session ids) follows the call into the
+worker.
+"""
+
+import contextvars
+
+from PyQt5 import QtCore
+
+from orchestrator.logging_setup import get_logger
+
+log = get_logger("gui.workers")
+
+# Database calls in flight at once (the connection pool bounds the rest)
+DB_THREADS = 2
+
+_db_pool = None
+_inference_pool = None
+
+
+class TaskSignals(QtCore.QObject):
+    done = QtCore.pyqtSignal(object)
+    failed = QtCore.pyqtSignal(object)  # the exception
+
+
+class Task(QtCore.QRunnable):
+    def __init__(self, fn, *args, **kwargs):
+        super().__init__()
+        self.signals = TaskSignals()
+        self._context = contextvars.copy_context()
+        self._call = lambda: fn(*args, **kwargs)
+        self.cancelled = False
+
+    def run(self):
+        if self.cancelled:
+            return
+        try:
+            result = self._context.run(self._call)
+        except Exception as err:
+            log.exception("background task failed")
+            self.signals.failed.emit(err)
+        else:
+            self.signals.done.emit(result)
+
+
+def db_pool() -> QtCore.QThreadPool:
+    global _db_pool
+    if _db_pool is None:
+        _db_pool = QtCore.QThreadPool()
+        _db_pool.setMaxThreadCount(DB_THREADS)
+    return _db_pool
+
+
+def inference_pool() -> QtCore.QThreadPool:
+    global _inference_pool
+    if _inference_pool is None:
+        _inference_pool = QtCore.QThreadPool()
+        _inference_pool.setMaxThreadCount(1)
+        _inference_pool.setExpiryTimeout(-1)  # keep the thread (and its torch state) alive
+    return _inference_pool
+
+
+def submit(pool, fn, *args, on_done=None, on_error=None, **kwargs) -> Task:
+    """Run fn(*args, **kwargs) on `pool`; callbacks run on the main thread."""
+    task = Task(fn, *args, **kwargs)
+    # Queued explicitly: plain callables would otherwise run on the worker thread
+    if on_done is not None:
+        task.signals.done.connect(on_done, QtCore.Qt.QueuedConnection)
+    if on_error is not None:
+        task.signals.failed.connect(on_error, QtCore.Qt.QueuedConnection)
+    pool.start(task)
+    return task
+
+
+def wait_all(timeout_ms=5000) -> None:
+    """Let queued work finish, e.g. before the window closes."""
+    for pool in (_inference_pool, _db_pool):
+        if pool is not None:
+            pool.clear()  # drop what has not started
+            pool.waitForDone(timeout_ms)
@@ -0,0 +1,155 @@
+"""
+orchestrator/logging_setup.py – level-gated, queue-backed structured logging
+
+Records are handed to a QueueHandler on the calling thread and formatted /
+written by a background QueueListener, so the request path never blocks on
+stdout. Each record carries the current request_id and session_id (bound via
+contextvars), so concurrent sessions can be told apart.
+
+Environment:
+    MINDMATE_LOG_LEVEL   DEBUG | INFO | WARNING | ERROR   (default INFO)
+    MINDMATE_LOG_FORMAT  text | json                      (default text)
+
+Per-message detail (including user text) is logged at DEBUG only; pass values
+as %-style args so disabled levels cost a single isEnabledFor() check.
+"""
+
+import atexit
+import contextvars
+import itertools
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+from contextlib import contextmanager
+
+ROOT_LOGGER = "mindmate"
+DEFAULT_LEVEL = "INFO"
+TEXT_FORMAT = "%(asctime)s %(levelname)-7s %(name)s [req=%(request_id)s sess=%(session_id)s] %(message)s"
+
+_request_id = contextvars.ContextVar("request_id", default="-")
+_session_id = contextvars.ContextVar("session_id", default="-")
+_request_counter = itertools.count(1)
+
+_listener = None
+_handler = None
+_configure_lock = threading.Lock()
+
+
+class _ContextFilter(logging.Filter):
+    """Stamp request/session ids on the record while still on the caller's thread."""
+
+    def filter(self, record):
+        record.request_id = _request_id.get()
+        record.session_id = _session_id.get()
+        return True
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that skips message formatting on the calling thread.
+
+    The stock prepare() merges args into msg before enqueueing; we leave that
+    to the listener. Log args must therefore not be mutated after the call.
+    """
+
+    def prepare(self, record):
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        payload = {
+            "ts": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "request_id": getattr(record, "request_id", "-"),
+            "session_id": getattr(record, "session_id", "-"),
+            "msg": record.getMessage(),
+        }
+        if record.exc_info:
+            payload["exc"] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False)
+
+
+def configure(level=None, fmt=None, stream=None) -> logging.Logger:
+    """Install the queue handler/listener pair on the `mindmate` logger (idempotent)."""
+    global _listener, _handler
+    with _configure_lock:
+        root = logging.getLogger(ROOT_LOGGER)
+        level = (level or os.environ.get("MINDMATE_LOG_LEVEL", DEFAULT_LEVEL)).upper()
+        root.setLevel(level)
+        if _listener is not None:
+            return root
+
+        fmt = (fmt or os.environ.get("MINDMATE_LOG_FORMAT", "text")).lower()
+        sink = logging.StreamHandler(stream or sys.stderr)
+        sink.setFormatter(JsonFormatter() if fmt == "json" else logging.Formatter(TEXT_FORMAT))
+
+        log_queue = queue.SimpleQueue()
+        _handler = _DeferredQueueHandler(log_queue)
+        _handler.addFilter(_ContextFilter())
+        root.addHandler(_handler)
+        root.propagate = False
+
+        _listener = logging.handlers.QueueListener(log_queue, sink, respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown)
+        return root
+
+
+def shutdown() -> None:
+    """Flush queued records, stop the background listener and detach its handler."""
+    global _listener, _handler
+    with _configure_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+        if _handler is not None:
+            # a later configure() installs a fresh pair; don't leave this one on a dead queue
+            logging.getLogger(ROOT_LOGGER).removeHandler(_handler)
+            _handler = None
+
+
+def _restart_after_fork() -> None:
+    """The listener thread does not survive fork(); give the child a fresh queue and thread."""
+    global _listener, _configure_lock
+    _configure_lock = threading.Lock()  # may have been held by another thread at fork time
+    if _listener is None:
+        return
+    log_queue = queue.SimpleQueue()
+    _handler.queue = log_queue
+    _listener = logging.handlers.QueueListener(log_queue, *_listener.handlers, respect_handler_level=True)
+    _listener.start()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_restart_after_fork)
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Return `mindmate.<name>`, configuring logging on first use."""
+    if _listener is None:
+        configure()
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
+
+
+def new_request_id() -> str:
+    return f"{os.getpid():x}-{next(_request_counter):06d}"
+
+
+@contextmanager
+def bind(request_id=None, session_id=None):
+    """Attach request/session ids to every record logged inside the block."""
+    tokens = []
+    if request_id is not None:
+        tokens.append((_request_id, _request_id.set(str(request_id))))
+    if session_id is not None:
+        tokens.append((_session_id, _session_id.set(str(session_id))))
+    try:
+        yield
+    finally:
+        for var, token in reversed(tokens):
+            var.reset(token)
@@ -0,0 +1,229 @@
+"""
+orchestrator/metrics.py – lightweight per-stage latency instrumentation
+
+Stages are timed with a monotonic clock (time.perf_counter) and folded into
+fixed-bucket histograms, so recording is O(log buckets) and memory stays flat.
+Counters track which stage answered a message and cache hit/miss totals.
+
+Disabled by default; set MINDMATE_METRICS=1 (or call enable()) to record.
+When disabled, stage() hands back a shared no-op context manager.
+
+    from orchestrator import metrics
+    with metrics.stage("faq_query"):
+        ...
+    metrics.snapshot()        # dict, queryable in-process
+    metrics.snapshot_text()   # Prometheus-style text exposition
+    metrics.serve(9108)       # local scrape endpoint on 127.0.0.1
+"""
+
+import bisect
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from orchestrator.logging_setup import get_logger
+
+# Histogram bucket upper bounds in milliseconds (roughly log-spaced)
+BUCKETS_MS = (
+    0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100,
+    250, 500, 1000, 2500, 5000, 10000, 30000, 60000,
+)
+# Default scrape endpoint
+METRICS_HOST = "127.0.0.1"
+METRICS_PORT = 9108
+
+log = get_logger("metrics")
+
+_enabled = os.environ.get("MINDMATE_METRICS", "0").lower() in ("1", "true", "yes")
+_lock = threading.Lock()
+
+
+class Histogram:
+    """Fixed-bucket latency histogram with percentile estimation."""
+
+    __slots__ = ("counts", "count", "total_ms", "max_ms")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)  # last slot = +Inf
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, ms: float) -> None:
+        self.counts[bisect.bisect_left(BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+
+    def percentile(self, q: float) -> float:
+        """Estimate the q-th percentile (0–100) by interpolating inside its bucket."""
+        if not self.count:
+            return 0.0
+        rank = q / 100.0 * self.count
+        seen = 0
+        for i, c in enumerate(self.counts):
+            if not c:
+                continue
+            if seen + c >= rank:
+                lower = BUCKETS_MS[i - 1] if i > 0 else 0.0
+                upper = BUCKETS_MS[i] if i < len(BUCKETS_MS) else self.max_ms
+                upper = min(upper, self.max_ms)
+                frac = (rank - seen) / c
+                return lower + (upper - lower) * frac
+            seen += c
+        return self.max_ms
+
+    def summary(self) -> dict:
+        return {
+            "count": self.count,
+            "mean_ms": self.total_ms / self.count if self.count else 0.0,
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "p99_ms": self.percentile(99),
+            "max_ms": self.max_ms,
+        }
+
+
+_histograms = {}  # stage name -> Histogram
+_counters = {}    # (metric, label) -> int
+
+
+def enable(flag: bool = True) -> None:
+    global _enabled
+    _enabled = bool(flag)
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def reset() -> None:
+    with _lock:
+        _histograms.clear()
+        _counters.clear()
+
+
+def observe(name: str, ms: float) -> None:
+    """Record a duration (milliseconds) for stage `name`."""
+    if not _enabled:
+        return
+    with _lock:
+        hist = _histograms.get(name)
+        if hist is None:
+            hist = _histograms[name] = Histogram()
+        hist.observe(ms)
+
+
+def incr(metric: str, label: str = "", n: int = 1) -> None:
+    if not _enabled:
+        return
+    with _lock:
+        key = (metric, label)
+        _counters[key] = _counters.get(key, 0) + n
+
+
+def answered_by(stage_name: str) -> None:
+    """Count which routing stage produced the reply."""
+    incr("answered_by", stage_name)
+
+
+def cache_access(cache: str, hit: bool) -> None:
+    incr("cache_hits" if hit else "cache_misses", cache)
+
+
+class _NoopTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _NoopTimer()
+
+
+@contextmanager
+def _timer(name: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, (time.perf_counter() - start) * 1000.0)
+
+
+def stage(name: str):
+    """Context manager timing one stage; free when metrics are disabled."""
+    if not _enabled:
+        return _NOOP
+    return _timer(name)
+
+
+# 📊 Export
+def snapshot() -> dict:
+    """Return histograms, counters and cache hit rates as plain dicts."""
+    with _lock:
+        stages = {name: h.summary() for name, h in _histograms.items()}
+        counters = {}
+        for (metric, label), value in _counters.items():
+            counters.setdefault(metric, {})[label] = value
+    caches = {}
+    hits = counters.get("cache_hits", {})
+    misses = counters.get("cache_misses", {})
+    for cache in set(hits) | set(misses):
+        h, m = hits.get(cache, 0), misses.get(cache, 0)
+        caches[cache] = {"hits": h, "misses": m, "hit_rate": h / (h + m) if h + m else 0.0}
+    return {"stages": stages, "counters": counters, "caches": caches}
+
+
+def snapshot_text() -> str:
+    """Render a Prometheus-style text metrics snapshot."""
+    lines = []
+    with _lock:
+        hists = [(name, list(h.counts), h.count, h.total_ms) for name, h in _histograms.items()]
+        counters = sorted(_counters.items())
+    if hists:
+        lines.append("# TYPE mindmate_stage_latency_ms histogram")
+    for name, counts, count, total in sorted(hists):
+        cumulative = 0
+        for bound, c in zip(BUCKETS_MS, counts):
+            cumulative += c
+            lines.append(f'mindmate_stage_latency_ms_bucket{{stage="{name}",le="{bound}"}} {cumulative}')
+        lines.append(f'mindmate_stage_latency_ms_bucket{{stage="{name}",le="+Inf"}} {count}')
+        lines.append(f'mindmate_stage_latency_ms_sum{{stage="{name}"}} {total:.3f}')
+        lines.append(f'mindmate_stage_latency_ms_count{{stage="{name}"}} {count}')
+    seen_types = set()
+    for (metric, label), value in counters:
+        if metric not in seen_types:
+            lines.append(f"# TYPE mindmate_{metric}_total counter")
+            seen_types.add(metric)
+        lines.append(f'mindmate_{metric}_total{{name="{label}"}} {value}')
+    return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.rstrip("/") not in ("", "/metrics"):
+            self.send_error(404)
+            return
+        body = snapshot_text().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass  # keep scrapes off stdout
+
+
+def serve(port: int = METRICS_PORT, host: str = METRICS_HOST) -> ThreadingHTTPServer:
+    """Start a local /metrics scrape endpoint in a daemon thread."""
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    log.info("Serving snapshot on http://%s:%s/metrics", host, server.server_port)
+    return server
@@ -3,13 +3,23 @@
 from preprocessing.text_normalizer import normalize
 from retrieval.index import faq_query
 from chatbot.rule_based_chatbot2 import generate_bot_reply as generate_reply
-import traceback
+from orchestrator import metrics
+from orchestrator.logging_setup import get_logger
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
 import re
+import time
+
+log = get_logger("router")
 
 # Similarity threshold for FAQ matching
 SIM_THRESHOLD = 0.78
 # Number of sentences to keep from a generated reply
 MAX_SENTENCES = 3
+# Worker threads used by route_async for the CPU-bound stages
+ASYNC_WORKERS = 4
+# Reply used when the generator fails or returns nothing
+FALLBACK_REPLY = "I'm not sure how to respond."
 
 # Simple pattern-response map
 PATTERN_RESPONSES = [
@@ -38,9 +48,8 @@ SELF_HARM_RESPONSE = (
 def _safe(func, *args, fallback=None, tag="step"):
     try:
         return func(*args)
-    except Exception as e:
-        print(f"[router][ERROR] {tag}: {e}")
-        traceback.print_exc()
+    except Exception:
+        log.exception("%s failed", tag)
         return fallback
 
 
@@ -55,42 +64,153 @@ def truncate_reply_text(text: str, max_sentences: int = MAX_SENTENCES) -> str:
     return truncated
 
 
-def route(user_raw: str) -> str:
-    """Main routing function: simple regex patterns, self-harm filter, FAQ lookup, then generator fallback."""
+def _prefilter(user_raw: str):
+    """Normalize, then try pattern and self-harm replies. Returns (user_norm, reply or None)."""
     # 1. Normalize user input
-    user_norm = normalize(user_raw)
-    print(f"[router] RAW → {user_raw}")
-    print(f"[router] NORM → {user_norm}")
+    with metrics.stage("normalize"):
+        user_norm = normalize(user_raw)
+    log.debug("RAW → %s | NORM → %s", user_raw, user_norm)
 
     lowered = user_norm.strip().lower()
 
     # 2. Check simple pattern-based responses
-    for pattern, reply in PATTERN_RESPONSES:
-        if re.search(pattern, lowered):
-            print(f"[router] PATTERN matched: {pattern}")
-            return reply
+    with metrics.stage("pattern"):
+        matched = next((p for p in PATTERN_RESPONSES if re.search(p[0], lowered)), None)
+    if matched:
+        log.debug("PATTERN matched: %s", matched[0])
+        metrics.answered_by("pattern")
+        return user_norm, matched[1]
 
     # 3. Self-harm keyword detection
-    for kw in SELF_HARM_KEYWORDS:
-        if kw in lowered:
-            print(f"[router] SELF-HARM detected keyword: '{kw}'")
-            return SELF_HARM_RESPONSE
+    with metrics.stage("self_harm"):
+        hit_kw = next((kw for kw in SELF_HARM_KEYWORDS if kw in lowered), None)
+    if hit_kw:
+        log.info("SELF-HARM keyword detected: %r", hit_kw)
+        metrics.answered_by("self_harm")
+        return user_norm, SELF_HARM_RESPONSE
 
-    # 4. FAQ lookup for definition-like or common queries
-    result = _safe(faq_query, user_norm, fallback=None, tag="faq_query")
+    return user_norm, None
+
+
+def _faq_lookup(user_norm: str):
+    """Return (candidate, similarity) from the FAQ index."""
+    with metrics.stage("faq_query"):
+        result = _safe(faq_query, user_norm, fallback=None, tag="faq_query")
     candidate, sim = None, 0.0
     if isinstance(result, tuple) and len(result) == 2:
         candidate, sim = result
     elif isinstance(result, str):
         candidate = result
         sim = 1.0
-    print(f"[router] FAQ sim={sim:.2f} | hit={candidate}")
-    if candidate and sim >= SIM_THRESHOLD:
+    log.debug("FAQ sim=%.2f | hit=%s", sim, candidate)
+    return candidate, sim
+
+
+def _generate(user_raw: str) -> str:
+    with metrics.stage("generate"):
+        return _safe(generate_reply, user_raw, fallback=FALLBACK_REPLY, tag="generator")
+
+
+def _generate_speculative(user_raw: str):
+    """_generate without the stage timer: (reply, ms); the caller files the time once it
+    knows whether the reply was used (`generate`) or thrown away (`generate_wasted`)."""
+    t0 = time.perf_counter()
+    reply = _safe(generate_reply, user_raw, fallback=FALLBACK_REPLY, tag="generator")
+    return reply, (time.perf_counter() - t0) * 1000.0
+
+
+def _drop_speculative(gen_job) -> None:
+    """Cancel a speculative generation that is no longer wanted."""
+    if gen_job.cancel():
+        metrics.incr("speculative", "cancelled")
+        return
+    metrics.incr("speculative", "wasted")
+
+    def _record(job):
+        if job.exception() is None:
+            metrics.observe("generate_wasted", job.result()[1])
+
+    gen_job.add_done_callback(_record)
+
+
+def _faq_reply(candidate: str) -> str:
+    metrics.answered_by("faq")
+    with metrics.stage("truncate"):
         return truncate_reply_text(candidate, MAX_SENTENCES)
 
-    # 5. Generator fallback (truncated to max sentences)
-    full_reply = _safe(generate_reply, user_raw, fallback="I'm not sure how to respond.", tag="generator")
+
+def _generated_reply(full_reply: str) -> str:
     if not full_reply:
-        return "I'm not sure how to respond."
-    short_reply = truncate_reply_text(full_reply, MAX_SENTENCES)
-    return short_reply
+        metrics.answered_by("fallback")
+        return FALLBACK_REPLY
+    metrics.answered_by("generator")
+    with metrics.stage("truncate"):
+        return truncate_reply_text(full_reply, MAX_SENTENCES)
+
+
+def route(user_raw: str) -> str:
+    """Main routing function: simple regex patterns, self-harm filter, FAQ lookup, then generator fallback."""
+    user_norm, early = _prefilter(user_raw)
+    if early is not None:
+        return early
+
+    # 4. FAQ lookup for definition-like or common queries
+    candidate, sim = _faq_lookup(user_norm)
+    if candidate and sim >= SIM_THRESHOLD:
+        return _faq_reply(candidate)
+
+    # 5. Generator fallback (truncated to max sentences)
+    return _generated_reply(_generate(user_raw))
+
+
+_executor = None
+
+
+def _default_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=ASYNC_WORKERS, thread_name_prefix="route")
+    return _executor
+
+
+async def route_async(user_raw: str, speculative: bool = False, executor=None) -> str:
+    """
+    Asyncio variant of route(); CPU-bound stages run in `executor`.
+
+    With speculative=True generation starts alongside FAQ retrieval and is
+    cancelled if the FAQ clears SIM_THRESHOLD. A generation still queued is
+    dropped (counted as `cancelled`); one that has already started cannot be
+    interrupted, so its result is discarded, counted as `wasted` and timed under
+    `generate_wasted` rather than `generate`. If this coroutine is itself
+    cancelled, the speculative job is dropped the same way.
+    """
+    loop = asyncio.get_running_loop()
+    executor = executor or _default_executor()
+
+    user_norm, early = await loop.run_in_executor(executor, _prefilter, user_raw)
+    if early is not None:
+        return early
+
+    gen_job = None
+    try:
+        if speculative:
+            # the executor's own future: its cancel() is False once the work has started
+            # (an asyncio wrapper would report True even then)
+            gen_job = executor.submit(_generate_speculative, user_raw)
+            metrics.incr("speculative", "started")
+
+        candidate, sim = await loop.run_in_executor(executor, _faq_lookup, user_norm)
+        if candidate and sim >= SIM_THRESHOLD:
+            return _faq_reply(candidate)
+
+        if gen_job is not None:
+            full_reply, gen_ms = await asyncio.shield(asyncio.wrap_future(gen_job))
+            gen_job = None
+            metrics.incr("speculative", "used")
+            metrics.observe("generate", gen_ms)
+        else:
+            full_reply = await loop.run_in_executor(executor, _generate, user_raw)
+        return _generated_reply(full_reply)
+    finally:
+        if gen_job is not None:  # FAQ answered, or this coroutine was cancelled
+            _drop_speculative(gen_job)
@@ -0,0 +1,105 @@
+"""
+orchestrator/threads.py – one place to hand out CPU thread budgets
+
+torch intra-op threads, FAISS (OpenMP) threads and HF tokenizers parallelism
+all default to "every core". When the embedder, the generator and a worker
+pool run at once they oversubscribe the CPU and tail latency spikes. apply()
+splits the machine between processes/workers according to a profile:
+
+    interactive  one user: each request may use every core of its share
+    concurrent   many sessions: one core per inference worker, no nested pools
+
+Call apply() as early as possible – before torch/faiss are imported the
+environment variables are enough; afterwards the runtime setters are used.
+
+    from orchestrator import threads
+    budget = threads.apply("concurrent", processes=4, process_index=i, pin=True)
+
+MINDMATE_THREAD_PROFILE overrides the default profile name.
+"""
+
+import os
+import sys
+
+from orchestrator.logging_setup import get_logger
+
+log = get_logger("threads")
+
+DEFAULT_PROFILE = "interactive"
+
+# Per-process shape of each profile; "all" means every core in the process share
+PROFILES = {
+    "interactive": {
+        "inference_workers": 1,
+        "torch_threads": "all",
+        "interop_threads": 1,
+        "faiss_threads": "all",
+        "tokenizers_parallelism": True,
+    },
+    "concurrent": {
+        "inference_workers": "all",
+        "torch_threads": 1,
+        "interop_threads": 1,
+        "faiss_threads": 1,
+        "tokenizers_parallelism": False,
+    },
+}
+
+_THREAD_ENV_VARS = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS")
+
+
+def available_cpus() -> list:
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def plan(profile: str = None, processes: int = 1, process_index: int = 0) -> dict:
+    """Work out the budget for one process without applying anything."""
+    profile = profile or os.environ.get("MINDMATE_THREAD_PROFILE", DEFAULT_PROFILE)
+    if profile not in PROFILES:
+        raise ValueError(f"unknown thread profile {profile!r} (choose from {', '.join(PROFILES)})")
+    cpus = available_cpus()
+    processes = max(1, processes)
+    share = max(1, len(cpus) // processes)
+    start = (process_index % processes) * share
+    my_cpus = cpus[start:start + share] or cpus
+
+    resolve = lambda v: len(my_cpus) if v == "all" else v
+    budget = {k: resolve(v) for k, v in PROFILES[profile].items()}
+    budget.update(profile=profile, cpus=my_cpus)
+    return budget
+
+
+def apply(profile: str = None, processes: int = 1, process_index: int = 0, pin: bool = False) -> dict:
+    """Apply a thread budget to this process (env vars, torch, FAISS, affinity)."""
+    budget = plan(profile, processes, process_index)
+    math_threads = str(max(budget["torch_threads"], budget["faiss_threads"]))
+    for var in _THREAD_ENV_VARS:
+        os.environ[var] = math_threads
+    os.environ["TOKENIZERS_PARALLELISM"] = "true" if budget["tokenizers_parallelism"] else "false"
+
+    if "torch" in sys.modules:
+        torch = sys.modules["torch"]
+        torch.set_num_threads(budget["torch_threads"])
+        try:
+            torch.set_num_interop_threads(budget["interop_threads"])
+        except RuntimeError:
+            pass  # only settable before the first inter-op parallel call
+    if "faiss" in sys.modules:
+        sys.modules["faiss"].omp_set_num_threads(budget["faiss_threads"])
+
+    if pin and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, budget["cpus"])
+
+    log.info("🧵 profile=%s torch=%d interop=%d faiss=%d workers=%d cpus=%s%s",
+             budget["profile"], budget["torch_threads"], budget["interop_threads"],
+             budget["faiss_threads"], budget["inference_workers"],
+             _cpu_ranges(budget["cpus"]), " (pinned)" if pin else "")
+    return budget
+
+
+def _cpu_ranges(cpus) -> str:
+    if not cpus:
+        return "-"
+    return f"{cpus[0]}-{cpus[-1]}" if len(cpus) > 1 else str(cpus[0])
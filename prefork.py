@@ -0,0 +1,221 @@
+"""
+prefork.py – pre-fork serving: load models once, share them copy-on-write
+
+The parent imports the routing stack (SBERT encoder, FAISS index, DialoGPT),
+puts every torch module in eval mode with gradients disabled, freezes the GC
+generations, binds the listening socket and then forks N workers running
+service.py on that socket. Model weights are never written after the fork,
+so the pages stay shared between workers.
+
+Each worker gets its own slice of the cores through orchestrator.threads
+(optionally pinned with --pin) so the pool does not oversubscribe the box. The parent reports shared vs. private
+memory per worker from /proc/<pid>/smaps_rollup (Linux).
+
+    python prefork.py --workers 4 --port 8080 --thread-profile concurrent --pin
+"""
+
+import argparse
+import asyncio
+import gc
+import os
+import signal
+import socket
+import sys
+import time
+
+from orchestrator import logging_setup, threads
+
+log = logging_setup.get_logger("prefork")
+
+# Project modules that hold model globals
+MODEL_MODULES = ("retrieval.index", "chatbot.rule_based_chatbot", "chatbot.rule_based_chatbot2")
+# Seconds between memory reports
+REPORT_INTERVAL = 60
+# Respawn delay after a worker dies young; doubles with each quick exit in a row
+RESPAWN_BACKOFF = 0.5
+RESPAWN_BACKOFF_MAX = 30.0
+# A worker that ran this many seconds counts as healthy (resets its backoff)
+STABLE_AFTER = 60.0
+# Quick exits in a row of one slot after which the master gives up
+CRASH_LOOP_LIMIT = 5
+
+
+def load_models():
+    """Import the routing stack in the parent and freeze every torch module it holds."""
+    import torch
+    import orchestrator.router  # noqa: F401  (imports the retrieval + generator modules)
+
+    torch.set_grad_enabled(False)
+    frozen = 0
+    for name in MODEL_MODULES:
+        module = sys.modules.get(name)
+        if module is None:
+            continue
+        for value in vars(module).values():
+            if isinstance(value, torch.nn.Module):
+                value.eval()
+                for param in value.parameters():
+                    param.requires_grad_(False)
+                frozen += 1
+    log.info("🧊 %d model(s) loaded, set to eval and frozen", frozen)
+    return frozen
+
+
+def memory_usage(pid: int) -> dict:
+    """Shared / private / proportional memory of `pid` in KiB (Linux only)."""
+    fields = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 2 and parts[0].endswith(":") and parts[1].isdigit():
+                    fields[parts[0][:-1]] = int(parts[1])
+    except OSError:
+        return {}
+    return {
+        "rss_kb": fields.get("Rss", 0),
+        "pss_kb": fields.get("Pss", 0),
+        "shared_kb": fields.get("Shared_Clean", 0) + fields.get("Shared_Dirty", 0),
+        "private_kb": fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0),
+    }
+
+
+def report_memory(pids) -> None:
+    for pid in pids:
+        usage = memory_usage(pid)
+        if not usage:
+            continue
+        log.info("📦 worker %d: rss %.0f MiB = shared %.0f MiB + private %.0f MiB (pss %.0f MiB)",
+                 pid, usage["rss_kb"] / 1024, usage["shared_kb"] / 1024,
+                 usage["private_kb"] / 1024, usage["pss_kb"] / 1024)
+
+
+def _bind(host: str, port: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(512)
+    sock.setblocking(False)
+    return sock
+
+
+def _worker(sock, index, args) -> None:
+    """Child process body: never returns."""
+    code = 0
+    try:
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        budget = threads.apply(args.thread_profile, processes=args.workers,
+                               process_index=index, pin=args.pin)
+        import service
+        asyncio.run(service.serve(workers=args.inference_threads or budget["inference_workers"],
+                                  queue_size=args.queue_size,
+                                  persist=args.persist, grace=args.grace, sock=sock))
+    except Exception:
+        log.exception("worker %d crashed", os.getpid())
+        code = 1
+    finally:
+        logging_setup.shutdown()
+        os._exit(code)
+
+
+def _spawn(sock, index, args) -> int:
+    pid = os.fork()
+    if pid == 0:
+        _worker(sock, index, args)
+    log.info("👷 worker %d started (slot %d)", pid, index)
+    return pid
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Pre-fork MindMate service")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8080)
+    ap.add_argument("--workers", type=int, default=2, help="forked worker processes")
+    ap.add_argument("--thread-profile", choices=sorted(threads.PROFILES), default="concurrent")
+    ap.add_argument("--pin", action="store_true", help="pin each worker to its own cores")
+    ap.add_argument("--inference-threads", type=int, default=0,
+                    help="inference pool size per worker (0 = from the thread profile)")
+    ap.add_argument("--queue-size", type=int, default=8)
+    ap.add_argument("--persist", action="store_true")
+    ap.add_argument("--grace", type=float, default=30)
+    ap.add_argument("--report-interval", type=float, default=REPORT_INTERVAL)
+    args = ap.parse_args()
+
+    if not hasattr(os, "fork"):
+        sys.exit("❌ pre-fork mode needs os.fork (Linux/macOS); run service.py instead")
+
+    load_models()
+    sock = _bind(args.host, args.port)
+    log.info("🚀 Listening on http://%s:%s with %d worker(s)", args.host, args.port, args.workers)
+
+    # Move everything allocated so far out of the GC's reach so collections in
+    # the workers do not write to (and un-share) those pages.
+    gc.collect()
+    gc.freeze()
+
+    started = {}                                  # pid -> start time
+    workers = {}                                  # pid -> slot
+    for i in range(args.workers):
+        pid = _spawn(sock, i, args)
+        workers[pid], started[pid] = i, time.monotonic()
+    quick_exits = dict.fromkeys(range(args.workers), 0)
+    respawn_at = {}                               # slot -> monotonic time of its next fork
+    stopping = crash_loop = False
+
+    def _stop(signum, _frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, _stop)
+    signal.signal(signal.SIGTERM, _stop)
+
+    next_report = time.monotonic() + 5  # first report once workers settle
+    while workers or (respawn_at and not stopping):
+        now = time.monotonic()
+        for index, due in list(respawn_at.items()):
+            if stopping:
+                respawn_at.clear()
+            elif now >= due:
+                del respawn_at[index]
+                pid = _spawn(sock, index, args)
+                workers[pid], started[pid] = index, now
+        try:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            pid = 0
+            if not respawn_at:
+                break
+        if pid:
+            index = workers.pop(pid, None)
+            lived = now - started.pop(pid, now)
+            if not stopping and index is not None:
+                quick_exits[index] = quick_exits[index] + 1 if lived < STABLE_AFTER else 0
+                if quick_exits[index] >= CRASH_LOOP_LIMIT:
+                    log.error("❌ worker slot %d exited %d times in a row within %.0fs of starting – "
+                              "crash loop, stopping", index, quick_exits[index], STABLE_AFTER)
+                    crash_loop = True
+                    _stop(None, None)
+                    continue
+                delay = min(RESPAWN_BACKOFF * 2 ** (quick_exits[index] - 1), RESPAWN_BACKOFF_MAX) \
+                    if quick_exits[index] else 0.0
+                log.warning("worker %d exited (status %d) after %.1fs – respawning in %.1fs",
+                            pid, status, lived, delay)
+                respawn_at[index] = now + delay
+            continue
+        if time.monotonic() >= next_report:
+            report_memory(sorted(workers))
+            next_report = time.monotonic() + args.report_interval
+        time.sleep(0.5)
+    log.info("✅ All workers stopped")
+    if crash_loop:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
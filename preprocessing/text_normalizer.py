@@ -1,51 +1,159 @@
 """Updated text_normalizer.py to use SymSpell with your frequency dictionary for spell correction."""
 
+import hashlib
+import json
 import os
 import re
+import zlib
+from functools import lru_cache
 from symspellpy.symspellpy import SymSpell, Verbosity
 
+from orchestrator import metrics
+from orchestrator.logging_setup import get_logger
+
+log = get_logger("normalizer")
+
 # Maximum edit distance for corrections
 MAX_EDIT_DISTANCE = 2
 # Prefix length for SymSpell
 PREFIX_LENGTH = 7
+# Maximum number of memoised token corrections
+CORRECTION_CACHE_SIZE = 50_000
 
 # Filename of your frequency dictionary in the data folder
 DICTIONARY_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'frequency_dictionary_en_82_765.txt')
 # If your file has a different name, update DICTIONARY_PATH accordingly
 
+# Precompiled SymSpell snapshot (built by scripts/build_symspell_snapshot.py)
+SNAPSHOT_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'symspell_snapshot.bin')
+SNAPSHOT_MAGIC = b"MINDMATE-SYMSPELL\n"
+# Payload layout version: 2 = zlib over the uncompressed pickle (1 was zlib over gzip)
+SNAPSHOT_FORMAT = 2
+
 # Pattern to remove non-alphanumeric characters (except spaces)
 CLEANR = re.compile(r"[^\w\s]")
 
+
+def _dictionary_digest(path: str = DICTIONARY_PATH) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _snapshot_meta(digest: str) -> dict:
+    """Everything that must match for a snapshot to be reused."""
+    return {
+        "dictionary_sha256": digest,
+        "max_edit_distance": MAX_EDIT_DISTANCE,
+        "prefix_length": PREFIX_LENGTH,
+        "data_version": SymSpell.data_version,
+        "format": SNAPSHOT_FORMAT,
+    }
+
+
+def build_snapshot(path: str = SNAPSHOT_PATH) -> dict:
+    """
+    Build SymSpell from the text dictionary and write a snapshot:
+    magic line, JSON metadata line, then the zlib-compressed symspellpy pickle.
+    """
+    fresh = SymSpell(MAX_EDIT_DISTANCE, PREFIX_LENGTH)
+    fresh.load_dictionary(DICTIONARY_PATH, term_index=0, count_index=1)
+    meta = _snapshot_meta(_dictionary_digest())
+    payload = zlib.compress(fresh.save_pickle(to_bytes=True, compressed=False), 1)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(SNAPSHOT_MAGIC)
+        f.write(json.dumps(meta, sort_keys=True).encode("utf-8") + b"\n")
+        f.write(payload)
+    os.replace(tmp_path, path)
+    return meta
+
+
+def _load_snapshot(spell: SymSpell, path: str = SNAPSHOT_PATH) -> bool:
+    """Load a snapshot into `spell`; False if missing, unreadable or stale."""
+    if not os.path.exists(path):
+        return False
+    try:
+        with open(path, "rb") as f:
+            if f.readline() != SNAPSHOT_MAGIC:
+                return False
+            meta = json.loads(f.readline())
+            if meta != _snapshot_meta(_dictionary_digest()):
+                log.warning("SymSpell snapshot is stale – falling back to text dictionary")
+                return False
+            return spell.load_pickle(zlib.decompress(f.read()), compressed=False, from_bytes=True)
+    except (OSError, ValueError, zlib.error) as e:
+        log.warning("could not read SymSpell snapshot %s: %s", path, e)
+        return False
+
+
 # Initialize SymSpell once
 sym_spell = SymSpell(MAX_EDIT_DISTANCE, PREFIX_LENGTH)
-if os.path.exists(DICTIONARY_PATH):
+if not os.path.exists(DICTIONARY_PATH):
+    log.warning("dictionary file not found at %s", DICTIONARY_PATH)
+elif not _load_snapshot(sym_spell):
     # Load frequency dictionary: expects tab-delimited "term\tcount"
     sym_spell.load_dictionary(DICTIONARY_PATH, term_index=0, count_index=1)
-else:
-    print(f"[text_normalizer] WARNING: Dictionary file not found at {DICTIONARY_PATH}")
+
+
+def _lookup(token: str) -> str:
+    """Return the closest dictionary term for `token` (or the token itself)."""
+    # Lookup suggestions with maximum edit distance
+    suggestions = sym_spell.lookup(token, Verbosity.CLOSEST, max_edit_distance=MAX_EDIT_DISTANCE)
+    # Take the first suggestion (highest term frequency)
+    return suggestions[0].term if suggestions else token
+
+
+_cached_lookup = lru_cache(maxsize=CORRECTION_CACHE_SIZE)(_lookup)
+
+
+def correct_token(token: str) -> str:
+    """Spell-correct one lowercase token; dictionary words skip the lookup entirely."""
+    if token in sym_spell.words:
+        return token
+    return _cached_lookup(token)
+
+
+def _tokenize(text) -> list:
+    if not isinstance(text, str):
+        return []
+    # Lowercase, remove punctuation, split on whitespace
+    return re.sub(CLEANR, "", text.lower()).split()
 
 
 def normalize(text: str) -> str:
     """Normalize input by lowercasing, removing punctuation, and using SymSpell to correct spelled words."""
-    if not isinstance(text, str):
-        return ""
-    # Lowercase
-    text = text.lower()
-    # Remove punctuation
-    text = re.sub(CLEANR, "", text)
-    # Tokenize
-    tokens = text.split()
-    corrected_tokens = []
-    for token in tokens:
-        # Lookup suggestions with maximum edit distance
-        suggestions = sym_spell.lookup(token, Verbosity.CLOSEST, max_edit_distance=MAX_EDIT_DISTANCE)
-        if suggestions:
-            # Take the first suggestion (highest term frequency)
-            corrected_tokens.append(suggestions[0].term)
-        else:
-            corrected_tokens.append(token)
-    # Reassemble corrected text
-    return " ".join(corrected_tokens)
+    tokens = _tokenize(text)
+    if not metrics.is_enabled():
+        return " ".join([correct_token(t) for t in tokens])
+
+    before = _cached_lookup.cache_info()
+    corrected = " ".join([correct_token(t) for t in tokens])
+    after = _cached_lookup.cache_info()
+    metrics.incr("cache_hits", "normalize", after.hits - before.hits)
+    metrics.incr("cache_misses", "normalize", after.misses - before.misses)
+    return corrected
+
+
+def normalize_batch(texts) -> list:
+    """
+    Normalize many texts at once: tokens are deduplicated across the whole
+    batch so each distinct misspelling is looked up only once. Intended for
+    offline replay and dataset pipelines; bypasses the bounded memo so large
+    corpora do not evict the interactive working set.
+    """
+    tokenized = [_tokenize(t) for t in texts]
+    vocab = sym_spell.words
+    unique = {tok for tokens in tokenized for tok in tokens if tok not in vocab}
+    corrections = {tok: _lookup(tok) for tok in unique}
+    return [
+        " ".join([corrections.get(tok, tok) for tok in tokens])
+        for tokens in tokenized
+    ]
+
+
+def correction_cache_info():
+    """Hit/miss statistics of the per-token correction memo."""
+    return _cached_lookup.cache_info()
 
 # Example usage:
 # If "helo" appears, sym_spell will suggest "hello" if in dictionary.
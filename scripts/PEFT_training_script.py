@@ -24,7 +24,7 @@ BASE_MODEL = 'microsoft/DialoGPT-small'
 
 # --- Paths ---
 ROOT = pathlib.Path('/content')
-DATA_DIR = ROOT / 'content'       # train.jsonl & valid.jsonl here
+DATA_DIR = ROOT / 'content'       # train.jsonl & valid.jsonl (or .parquet) here
 OUT_DIR = pathlib.Path('/content/drive/MyDrive/mindmate_dialo_model')
 TRAIN_FILE = DATA_DIR / 'train.jsonl'
 VALID_FILE = DATA_DIR / 'valid.jsonl'
@@ -38,6 +38,14 @@ def read_jsonl(path: pathlib.Path):
     with open(path, 'r', encoding='utf-8') as f:
         return [json.loads(line) for line in f]
 
+# --- Read split: the Parquet copy if the merge wrote one (and it is current), else the JSONL ---
+def read_records(path: pathlib.Path):
+    pq_path = path.with_suffix('.parquet')
+    if pq_path.exists() and pq_path.stat().st_mtime >= path.stat().st_mtime:
+        import pyarrow.parquet as pq
+        return pq.read_table(pq_path, columns=['context', 'response']).to_pylist()
+    return read_jsonl(path)
+
 # --- Prepare texts & mask labels ---
 def prepare_texts(records, tokenizer, max_length=MAX_LENGTH):
     texts = []
@@ -105,8 +113,8 @@ def main():
 
     # Read data
     log('Reading train/valid files...')
-    train_raw = read_jsonl(TRAIN_FILE)
-    valid_raw = read_jsonl(VALID_FILE)
+    train_raw = read_records(TRAIN_FILE)
+    valid_raw = read_records(VALID_FILE)
     log(f"Loaded {len(train_raw)} train and {len(valid_raw)} valid examples.")
 
     # Tokenize
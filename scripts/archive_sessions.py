@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Move idle chat sessions out of the hot messages table
+-----------------------------------------------------
+Sessions whose newest message is older than --days have their messages
+packed into archived_sessions (one compressed payload per session) and
+deleted from messages. The sessions row stays, so the history list still
+shows them; opening one rehydrates it transparently. Archived messages drop
+out of full-text search until their session is opened again; exports
+(export_import.py) still include them.
+
+Runs in small batches (--batch sessions per transaction, --pause between
+batches), so it is safe to run while the app is serving. --compact reclaims
+the freed space afterwards (OPTIMIZE TABLE / VACUUM).
+
+Usage:
+    python scripts/archive_sessions.py --days 90
+    python scripts/archive_sessions.py --days 30 --batch 50 --max-batches 100 --compact
+"""
+
+import argparse, pathlib, sys, time
+
+SCRIPT_DIR   = pathlib.Path(__file__).resolve().parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from database.storage import ARCHIVE_AFTER_DAYS, ARCHIVE_BATCH, BACKENDS, open_storage, resolve_backend  # noqa: E402
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--backend", choices=sorted(BACKENDS), default=None)
+    ap.add_argument("--sqlite-path", default=None)
+    ap.add_argument("--days", type=int, default=ARCHIVE_AFTER_DAYS, help="retention window of the hot table")
+    ap.add_argument("--batch", type=int, default=ARCHIVE_BATCH, help="sessions per transaction")
+    ap.add_argument("--max-batches", type=int, default=None, help="stop after this many batches")
+    ap.add_argument("--pause", type=float, default=0.05, help="seconds to sleep between batches")
+    ap.add_argument("--compact", action="store_true", help="reclaim space afterwards")
+    args = ap.parse_args()
+    if args.sqlite_path and resolve_backend(args.backend) != "sqlite":
+        ap.error(f"--sqlite-path only applies to the sqlite backend, not {resolve_backend(args.backend)}")
+
+    options = {"path": args.sqlite_path} if args.sqlite_path else {}
+    storage = open_storage(args.backend, **options)
+    try:
+        storage.init_schema()
+        t0 = time.perf_counter()
+        archived = storage.archive_sessions(args.days, batch_size=args.batch,
+                                            max_batches=args.max_batches, pause=args.pause)
+        print(f"[+] archived {archived} session(s) in {time.perf_counter() - t0:.1f}s")
+        if args.compact:
+            t0 = time.perf_counter()
+            storage.compact()
+            print(f"[+] compacted in {time.perf_counter() - t0:.1f}s")
+    finally:
+        storage.close()
+    print("[✓] done")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark for preprocessing.text_normalizer
+------------------------------------------------------
+Reads the context/user column of every CSV in scripts/data/Final_Datasets
+(same schema detection as the merge script) and times three ways of
+normalizing the merged texts:
+
+  baseline  : one sym_spell.lookup per token, no memo (previous behaviour)
+  memo      : normalize() with the dictionary fast path + bounded memo
+  batch     : normalize_batch() deduplicating tokens across the batch
+
+Usage:
+    python scripts/bench_normalize.py --limit 20000 --batch-size 5000
+"""
+
+import argparse, pathlib, sys, time
+
+SCRIPT_DIR   = pathlib.Path(__file__).resolve().parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+import pandas as pd                                               # noqa: E402
+from symspellpy.symspellpy import Verbosity                       # noqa: E402
+from preprocessing import text_normalizer as tn                   # noqa: E402
+
+DATA_DIR = SCRIPT_DIR / "data" / "Final_Datasets"
+CONTEXT_COLUMNS = ("user", "context", "question", "prompt")
+
+
+def load_texts(limit: int) -> list:
+    texts = []
+    for path in sorted(DATA_DIR.glob("*.csv")):
+        df = pd.read_csv(path, dtype=str)
+        cols = {c.lower(): c for c in df.columns}
+        col = next((cols[c] for c in CONTEXT_COLUMNS if c in cols), None)
+        if col is None:
+            print(f"[skip] {path.name}: no context column")
+            continue
+        texts.extend(df[col].dropna().tolist())
+    return texts[:limit] if limit else texts
+
+
+def baseline_normalize(text: str) -> str:
+    tokens = tn._tokenize(text)
+    out = []
+    for token in tokens:
+        suggestions = tn.sym_spell.lookup(token, Verbosity.CLOSEST, max_edit_distance=tn.MAX_EDIT_DISTANCE)
+        out.append(suggestions[0].term if suggestions else token)
+    return " ".join(out)
+
+
+def timed(label, fn, n_msgs, n_tokens):
+    t0 = time.perf_counter()
+    result = fn()
+    dt = time.perf_counter() - t0
+    print(f"{label:<9} {dt:8.2f}s  {n_msgs / dt:10.0f} msg/s  {n_tokens / dt:11.0f} tok/s")
+    return result
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--limit", type=int, default=20000, help="max texts (0 = all)")
+    ap.add_argument("--batch-size", type=int, default=5000)
+    args = ap.parse_args()
+
+    texts = load_texts(args.limit)
+    n_tokens = sum(len(tn._tokenize(t)) for t in texts)
+    print(f"[+] {len(texts)} texts, {n_tokens} tokens")
+
+    base = timed("baseline", lambda: [baseline_normalize(t) for t in texts], len(texts), n_tokens)
+    memo = timed("memo", lambda: [tn.normalize(t) for t in texts], len(texts), n_tokens)
+
+    def run_batches():
+        out = []
+        for i in range(0, len(texts), args.batch_size):
+            out.extend(tn.normalize_batch(texts[i:i + args.batch_size]))
+        return out
+
+    batch = timed("batch", run_batches, len(texts), n_tokens)
+    assert base == memo == batch, "normalizer outputs diverged"
+    print(f"[=] memo cache: {tn.correction_cache_info()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Replay load test for MindMate
+-----------------------------
+Replays user_input rows from data/conversation_pairs.csv (plus seeded typo and
+paraphrase variants) through MindMateBot.get_reply in-process, or through a
+running service.py instance, at a given concurrency and arrival rate.
+
+Reports throughput, end-to-end latency percentiles, p50/p95/p99 per routing
+stage, which stage answered, and peak RSS. Results are saved as JSON so runs
+can be diffed between commits:
+
+    python scripts/bench_replay.py --concurrency 4 --rate 5 --out base.json
+    python scripts/bench_replay.py --concurrency 4 --rate 5 --out new.json --compare base.json
+
+Compare CPU thread profiles (see orchestrator/threads.py) for their p99 effect:
+
+    python scripts/bench_replay.py --concurrency 8 --thread-profile interactive --out inter.json
+    python scripts/bench_replay.py --concurrency 8 --thread-profile concurrent --compare inter.json
+
+--rate 0 runs closed-loop (each worker sends as soon as its last reply lands).
+With --rate > 0 arrivals are Poisson and latency is measured from the
+scheduled arrival time, so queueing delay is included.
+"""
+
+import argparse, json, pathlib, random, statistics, subprocess, sys, threading, time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+SCRIPT_DIR   = pathlib.Path(__file__).resolve().parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+import pandas as pd                                     # noqa: E402
+from orchestrator import metrics, threads               # noqa: E402
+
+CSV = PROJECT_ROOT / "data" / "conversation_pairs.csv"
+# Relative change treated as a regression by --compare
+REGRESSION_TOLERANCE = 0.10
+
+_PARAPHRASE_PREFIXES = ["", "Honestly, ", "I think ", "Lately ", "To be honest ", "So "]
+_PARAPHRASE_SUFFIXES = ["", " lately", " these days", " right now", " I guess"]
+_CONTRACTIONS = [("I am", "I'm"), ("can not", "can't"), ("cannot", "can't"),
+                 ("do not", "don't"), ("it is", "it's"), ("I have", "I've")]
+
+
+# ── workload ────────────────────────────────────────────────
+def typo_variant(text: str, rng: random.Random) -> str:
+    """Inject 1–2 keyboard-style typos (drop, swap or double a letter)."""
+    chars = list(text)
+    for _ in range(rng.randint(1, 2)):
+        letters = [i for i, c in enumerate(chars) if c.isalpha()]
+        if len(letters) < 3:
+            break
+        i = rng.choice(letters[1:-1])
+        op = rng.random()
+        if op < 0.4:
+            del chars[i]
+        elif op < 0.8:
+            chars[i], chars[i + 1] = chars[i + 1], chars[i]
+        else:
+            chars.insert(i, chars[i])
+    return "".join(chars)
+
+
+def paraphrase_variant(text: str, rng: random.Random) -> str:
+    out = text.rstrip(".!?")
+    for long, short in _CONTRACTIONS:
+        if rng.random() < 0.5:
+            out = out.replace(long, short)
+    prefix = rng.choice(_PARAPHRASE_PREFIXES)
+    if prefix:
+        out = prefix + out[:1].lower() + out[1:]
+    return out + rng.choice(_PARAPHRASE_SUFFIXES)
+
+
+def build_workload(limit: int, variants, seed: int) -> list:
+    rng = random.Random(seed)
+    base = pd.read_csv(CSV)["user_input"].dropna().astype(str).tolist()
+    rng.shuffle(base)
+    texts = []
+    for text in base:
+        texts.append(text)
+        if "typo" in variants:
+            texts.append(typo_variant(text, rng))
+        if "paraphrase" in variants:
+            texts.append(paraphrase_variant(text, rng))
+    return texts[:limit] if limit else texts
+
+
+# ── targets ─────────────────────────────────────────────────
+class InProcessTarget:
+    def __init__(self):
+        from chatbot_engine import MindMateBot, SessionManager
+        self.bot = MindMateBot(SessionManager(loader=None))
+        metrics.enable()
+
+    def new_session(self, worker: int):
+        return f"bench-{worker}"
+
+    def reply(self, session_id, text):
+        return self.bot.get_reply(text, session_id=session_id)
+
+    def reset_metrics(self):
+        metrics.reset()
+
+    def snapshot(self) -> dict:
+        from service import peak_rss_kb
+        return dict(metrics.snapshot(), peak_rss_kb=peak_rss_kb())
+
+
+class HttpTarget:
+    """Talks to service.py; the service must run with MINDMATE_METRICS=1 for stage data."""
+
+    def __init__(self, base_url: str):
+        self.base = base_url.rstrip("/")
+
+    def _call(self, path, payload=None):
+        data = json.dumps(payload).encode("utf-8") if payload is not None else None
+        req = urllib.request.Request(self.base + path, data=data, method="POST" if data else "GET",
+                                     headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(req, timeout=120) as resp:
+            return json.loads(resp.read())
+
+    def new_session(self, worker: int):
+        return self._call("/sessions", {})["session_id"]
+
+    def reply(self, session_id, text):
+        return self._call("/reply", {"session_id": session_id, "text": text})["reply"]
+
+    def reset_metrics(self):
+        pass  # remote metrics are cumulative – restart the service between runs
+
+    def snapshot(self) -> dict:
+        return self._call("/metrics.json")
+
+
+# ── run ─────────────────────────────────────────────────────
+def percentiles(values) -> dict:
+    if not values:
+        return {"p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0, "mean_ms": 0.0}
+    ordered = sorted(values)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+    return {"p50_ms": pick(50), "p95_ms": pick(95), "p99_ms": pick(99), "mean_ms": statistics.fmean(ordered)}
+
+
+def run(target, texts, concurrency: int, rate: float, seed: int) -> dict:
+    rng = random.Random(seed)
+    sessions = [target.new_session(w) for w in range(concurrency)]
+    latencies, errors = [], 0
+    lock = threading.Lock()
+
+    def one(i, text, scheduled):
+        nonlocal errors
+        start = scheduled if scheduled is not None else time.perf_counter()
+        try:
+            target.reply(sessions[i % concurrency], text)
+            ok = True
+        except Exception:
+            ok = False
+        elapsed = (time.perf_counter() - start) * 1000.0
+        with lock:
+            if ok:
+                latencies.append(elapsed)
+            else:
+                errors += 1
+
+    target.reset_metrics()
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        if rate > 0:
+            arrival = t0
+            for i, text in enumerate(texts):
+                arrival += rng.expovariate(rate)
+                delay = arrival - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                pool.submit(one, i, text, arrival)
+        else:
+            list(pool.map(lambda it: one(it[0], it[1], None), enumerate(texts)))
+    wall = time.perf_counter() - t0
+
+    snap = target.snapshot()
+    return {
+        "messages": len(texts),
+        "errors": errors,
+        "wall_s": wall,
+        "throughput_msg_s": len(latencies) / wall if wall else 0.0,
+        "latency": percentiles(latencies),
+        "stages": snap.get("stages", {}),
+        "answered_by": snap.get("counters", {}).get("answered_by", {}),
+        "peak_rss_kb": snap.get("peak_rss_kb"),
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(new: dict, old: dict) -> bool:
+    """Print a diff of headline numbers; True if anything regressed."""
+    regressed = False
+    rows = [("throughput_msg_s", new["throughput_msg_s"], old["throughput_msg_s"], True)]
+    for key in ("p50_ms", "p95_ms", "p99_ms"):
+        rows.append((f"latency.{key}", new["latency"][key], old["latency"][key], False))
+    for stage_name in sorted(set(new["stages"]) & set(old["stages"])):
+        rows.append((f"{stage_name}.p99_ms", new["stages"][stage_name]["p99_ms"],
+                     old["stages"][stage_name]["p99_ms"], False))
+    if new.get("peak_rss_kb") and old.get("peak_rss_kb"):
+        rows.append(("peak_rss_kb", new["peak_rss_kb"], old["peak_rss_kb"], False))
+
+    print(f"\n{'metric':<28} {'old':>12} {'new':>12} {'change':>9}")
+    for name, new_v, old_v, higher_is_better in rows:
+        change = (new_v - old_v) / old_v if old_v else 0.0
+        worse = change < -REGRESSION_TOLERANCE if higher_is_better else change > REGRESSION_TOLERANCE
+        regressed |= worse
+        print(f"{name:<28} {old_v:>12.1f} {new_v:>12.1f} {change:>+8.1%}{'  ⚠' if worse else ''}")
+    return regressed
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--target", default="inprocess", help="'inprocess' or service URL, e.g. http://127.0.0.1:8080")
+    ap.add_argument("--concurrency", type=int, default=1)
+    ap.add_argument("--rate", type=float, default=0.0, help="arrivals per second (0 = closed loop)")
+    ap.add_argument("--limit", type=int, default=500, help="messages to send (0 = whole workload)")
+    ap.add_argument("--variants", default="typo,paraphrase", help="comma list of: typo, paraphrase")
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--thread-profile", choices=sorted(threads.PROFILES),
+                    help="CPU thread profile for the in-process target")
+    ap.add_argument("--out", type=pathlib.Path, help="write JSON results here")
+    ap.add_argument("--compare", type=pathlib.Path, help="previous JSON results to diff against")
+    args = ap.parse_args()
+
+    if not CSV.exists():
+        sys.exit(f"❌ CSV not found: {CSV}")
+    variants = {v.strip() for v in args.variants.split(",") if v.strip()}
+    texts = build_workload(args.limit, variants, args.seed)
+    if args.target == "inprocess":
+        if args.thread_profile:
+            threads.apply(args.thread_profile)  # before the models are imported
+        target = InProcessTarget()
+    else:
+        target = HttpTarget(args.target)
+
+    print(f"[+] Replaying {len(texts)} messages → {args.target} "
+          f"(concurrency {args.concurrency}, rate {args.rate or 'closed-loop'})")
+    result = run(target, texts, args.concurrency, args.rate, args.seed)
+    report = {
+        "revision": git_revision(),
+        "config": {"target": args.target, "concurrency": args.concurrency, "rate": args.rate,
+                   "limit": args.limit, "variants": sorted(variants), "seed": args.seed,
+                   "thread_profile": args.thread_profile},
+        "result": result,
+    }
+
+    lat = result["latency"]
+    print(f"[=] {result['throughput_msg_s']:.2f} msg/s, errors {result['errors']}, "
+          f"p50 {lat['p50_ms']:.1f} ms, p95 {lat['p95_ms']:.1f} ms, p99 {lat['p99_ms']:.1f} ms")
+    for name, s in sorted(result["stages"].items()):
+        print(f"    {name:<14} n={s['count']:<6} p50 {s['p50_ms']:8.1f}  p95 {s['p95_ms']:8.1f}  p99 {s['p99_ms']:8.1f} ms")
+    print(f"    answered by: {result['answered_by']}")
+    if result["peak_rss_kb"]:
+        print(f"    peak RSS: {result['peak_rss_kb'] / 1024:.0f} MiB")
+
+    if args.out:
+        args.out.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"[✓] Results written → {args.out}")
+    if args.compare:
+        old = json.loads(args.compare.read_text(encoding="utf-8"))
+        if compare(result, old["result"]):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
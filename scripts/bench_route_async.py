@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Benchmark route_async with and without speculative generation
+-------------------------------------------------------------
+Replays user_input rows from data/conversation_pairs.csv one at a time
+through orchestrator.router.route_async and reports, per mode:
+  * wall-clock latency per message (mean / p50 / p95)
+  * process CPU time per message (the cost of speculation)
+  * how often a speculative generation was used, wasted or cancelled before it ran
+
+Usage:
+    python scripts/bench_route_async.py --limit 200
+"""
+
+import argparse, asyncio, pathlib, statistics, sys, time
+
+SCRIPT_DIR   = pathlib.Path(__file__).resolve().parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+import pandas as pd                                      # noqa: E402
+from orchestrator import metrics                         # noqa: E402
+from orchestrator.router import route_async              # noqa: E402
+
+CSV = PROJECT_ROOT / "data" / "conversation_pairs.csv"
+
+
+def pct(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q / 100 * (len(values) - 1))))]
+
+
+async def run_mode(texts, speculative: bool) -> dict:
+    metrics.reset()
+    latencies = []
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    for text in texts:
+        t0 = time.perf_counter()
+        await route_async(text, speculative=speculative)
+        latencies.append((time.perf_counter() - t0) * 1000.0)
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+    spec = metrics.snapshot()["counters"].get("speculative", {})
+    return {
+        "mode": "speculative" if speculative else "sequential",
+        "messages": len(texts),
+        "mean_ms": statistics.fmean(latencies),
+        "p50_ms": pct(latencies, 50),
+        "p95_ms": pct(latencies, 95),
+        "cpu_ms_per_msg": cpu * 1000.0 / len(texts),
+        "wall_s": wall,
+        "spec_used": spec.get("used", 0),
+        "spec_wasted": spec.get("wasted", 0),
+        "spec_cancelled": spec.get("cancelled", 0),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--limit", type=int, default=200, help="number of inputs to replay")
+    ap.add_argument("--warmup", type=int, default=5, help="untimed warm-up messages")
+    args = ap.parse_args()
+
+    if not CSV.exists():
+        sys.exit(f"❌ CSV not found: {CSV}")
+    texts = pd.read_csv(CSV)["user_input"].dropna().astype(str).tolist()[: args.limit]
+    metrics.enable()
+
+    async def _run():
+        for text in texts[: args.warmup]:
+            await route_async(text)
+        return [await run_mode(texts, False), await run_mode(texts, True)]
+
+    results = asyncio.run(_run())
+    print(f"{'mode':<12} {'mean':>9} {'p50':>9} {'p95':>9} {'cpu/msg':>9} {'used':>6} {'wasted':>6} {'cancel':>6}")
+    for r in results:
+        print(f"{r['mode']:<12} {r['mean_ms']:>7.1f}ms {r['p50_ms']:>7.1f}ms {r['p95_ms']:>7.1f}ms "
+              f"{r['cpu_ms_per_msg']:>7.1f}ms {r['spec_used']:>6} {r['spec_wasted']:>6} {r['spec_cancelled']:>6}")
+    base, spec = results
+    print(f"[=] latency win {base['mean_ms'] - spec['mean_ms']:+.1f} ms/msg, "
+          f"extra CPU {spec['cpu_ms_per_msg'] - base['cpu_ms_per_msg']:+.1f} ms/msg")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Measure resident memory per idle MindMateBot session
+----------------------------------------------------
+Fills a SessionManager with N synthetic sessions of full turn buffers built
+from data/conversation_pairs.csv and reports measured bytes per session, plus
+how LRU eviction keeps the resident set bounded.
+
+Usage:
+    python scripts/bench_sessions.py --sessions 5000
+"""
+
+import argparse, itertools, pathlib, sys
+
+SCRIPT_DIR   = pathlib.Path(__file__).resolve().parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+import pandas as pd                                                     # noqa: E402
+from chatbot_engine import MAX_TURNS_PER_SESSION, SessionManager, Turn  # noqa: E402
+
+CSV = PROJECT_ROOT / "data" / "conversation_pairs.csv"
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--sessions", type=int, default=5000)
+    ap.add_argument("--max-resident", type=int, default=2000)
+    args = ap.parse_args()
+
+    pairs = pd.read_csv(CSV).dropna(subset=["user_input", "bot_reply"])
+    pairs = list(zip(pairs["user_input"].astype(str), pairs["bot_reply"].astype(str)))
+    cycle = itertools.cycle(pairs)
+
+    manager = SessionManager(max_sessions=args.max_resident, loader=None)
+    for sid in range(args.sessions):
+        session = manager.get(sid)
+        for _ in range(MAX_TURNS_PER_SESSION):
+            user, bot = next(cycle)
+            session.turns.append(Turn(user, bot))
+
+    report = manager.memory_report()
+    print(f"[+] created {args.sessions} sessions, {len(manager)} resident (cap {args.max_resident})")
+    print(f"    mean {report['mean_bytes'] / 1024:.1f} KiB / session, "
+          f"max {report['max_bytes'] / 1024:.1f} KiB, total {report['total_bytes'] / 2**20:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Storage backend insert/fetch micro-benchmark
+--------------------------------------------
+Runs the same timings against each backend in database/storage.py:
+
+  insert  single-row inserts and batched (write-behind sized) inserts
+  fetch   full-session fetch and latest-page fetch
+  search  ranked full-text queries (FULLTEXT / FTS5)
+
+SQLite runs on a throw-away file unless --sqlite-path is given. MySQL uses
+DB_CONFIG / MINDMATE_DB_* and writes its rows into a new benchmark session.
+The behaviour the backends must share is checked by tests/test_storage.py.
+
+Usage:
+    python scripts/bench_storage.py --backend sqlite
+    python scripts/bench_storage.py --backend mysql sqlite --messages 20000 --batch 64
+"""
+
+import argparse, os, pathlib, sys, tempfile, time
+from datetime import datetime, timedelta
+
+SCRIPT_DIR   = pathlib.Path(__file__).resolve().parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from database.storage import BACKENDS, open_storage  # noqa: E402
+
+
+def _rate(n, seconds):
+    return f"{n / seconds:>10,.0f} rows/s  ({seconds * 1000:8.1f} ms)"
+
+
+SEARCH_QUERIES = ("anxious", "sleep problems", "feeling lonely", "message 42")
+
+
+def bench(storage, messages, batch, pages):
+    sid = storage.create_session()
+    singles = max(1, messages // 10)
+    t0 = time.perf_counter()
+    for i in range(singles):
+        storage.log_message(sid, "user", f"single message {i}")
+    t_single = time.perf_counter() - t0
+
+    base = datetime.now().replace(microsecond=0)
+    rows = [(sid, "bot" if i % 2 else "user", f"batched message {i} " * 4, base + timedelta(seconds=i))
+            for i in range(messages)]
+    t0 = time.perf_counter()
+    for i in range(0, len(rows), batch):
+        storage.log_messages_bulk(rows[i:i + batch])
+    t_batch = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    fetched = len(storage.fetch_messages(sid))
+    t_full = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for _ in range(pages):
+        storage.fetch_messages_page(sid, limit=50)
+    t_page = time.perf_counter() - t0
+
+    searches = max(1, pages // 5)
+    t0 = time.perf_counter()
+    for i in range(searches):
+        storage.search_messages(SEARCH_QUERIES[i % len(SEARCH_QUERIES)])
+    t_search = time.perf_counter() - t0
+
+    print(f"[=] {storage.name}")
+    print(f"    insert single  {_rate(singles, t_single)}")
+    print(f"    insert x{batch:<5} {_rate(messages, t_batch)}")
+    print(f"    fetch full     {_rate(fetched, t_full)}")
+    print(f"    fetch page     {pages / t_page:>10,.0f} pages/s ({t_page / pages * 1000:.2f} ms / page of 50)")
+    print(f"    search         {searches / t_search:>10,.0f} queries/s ({t_search / searches * 1000:.2f} ms / query)")
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--backend", nargs="+", choices=sorted(BACKENDS), default=["sqlite"])
+    ap.add_argument("--sqlite-path", default=None, help="database file (default: temporary)")
+    ap.add_argument("--messages", type=int, default=10_000)
+    ap.add_argument("--batch", type=int, default=64, help="rows per batched insert")
+    ap.add_argument("--pages", type=int, default=500, help="latest-page fetches to time")
+    args = ap.parse_args()
+
+    for name in args.backend:
+        options, tmp_dir = {}, None
+        if name == "sqlite":
+            if args.sqlite_path is None:
+                tmp_dir = tempfile.TemporaryDirectory()
+                options["path"] = os.path.join(tmp_dir.name, "bench.sqlite3")
+            else:
+                options["path"] = args.sqlite_path
+        storage = open_storage(name, **options)
+        try:
+            storage.init_schema()
+            bench(storage, args.messages, args.batch, args.pages)
+        finally:
+            storage.close()
+            if tmp_dir is not None:
+                tmp_dir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -3,11 +3,14 @@
 Build SBERT embeddings + FAISS index for MindMate
 -------------------------------------------------
 Reads   : data/conversation_pairs.csv         (user_input, bot_reply)
+     or : scripts/data/cache/final_datasets.parquet  with --from-cache
+          (context, response; only those two columns are read, and
+          --source limits it to the row groups of the given datasets)
 Creates : models/faiss_index/index.bin        (binary FAISS index)
           models/faiss_index/responses.csv    (bot replies in original order)
 """
 
-import pathlib, sys, pandas as pd, numpy as np
+import argparse, pathlib, sys, pandas as pd, numpy as np
 
 # ---------------- project-root-agnostic paths ------------------------------
 SCRIPT_DIR   = pathlib.Path(__file__).resolve().parent          # …/scripts
@@ -21,16 +24,29 @@ def nice(p: pathlib.Path) -> str:
     try:  return str(p.relative_to(PROJECT_ROOT))
     except ValueError:  return str(p)
 
-# ---------------- sanity checks --------------------------------------------
-if not CSV.exists():
-    sys.exit(f"❌ CSV not found: {CSV}")
+ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+ap.add_argument("--from-cache", action="store_true", help="read the Final_Datasets columnar cache instead of the CSV")
+ap.add_argument("--source", action="append", help="with --from-cache: only this dataset (repeatable)")
+args = ap.parse_args()
 
 # ---------------- load -----------------------------------------------------
-print(f"[+] Loading pairs from {nice(CSV)} …")
-df = pd.read_csv(CSV, encoding="utf-8").dropna(subset=["user_input", "bot_reply"])
+if args.from_cache:
+    sys.path.insert(0, str(SCRIPT_DIR / "data"))
+    import columnar_cache
+    if not columnar_cache.CACHE_FILE.exists():
+        sys.exit(f"❌ Cache not found: {columnar_cache.CACHE_FILE} (run scripts/data/columnar_cache.py)")
+    print(f"[+] Loading pairs from {nice(columnar_cache.CACHE_FILE)} …")
+    df = (columnar_cache.load(columns=["context", "response"], sources=args.source)
+          .rename(columns={"context": "user_input", "response": "bot_reply"}))
+else:
+    # ---------------- sanity checks ----------------------------------------
+    if not CSV.exists():
+        sys.exit(f"❌ CSV not found: {CSV}")
+    print(f"[+] Loading pairs from {nice(CSV)} …")
+    df = pd.read_csv(CSV, encoding="utf-8").dropna(subset=["user_input", "bot_reply"])
 
 if df.empty:
-    sys.exit("❌ CSV is empty after dropping NaNs")
+    sys.exit("❌ No pairs to index")
 
 texts = df["user_input"].astype(str).tolist()
 print(f"    → {len(texts)} user inputs to embed")
@@ -0,0 +1,26 @@
+#!/usr/bin/env python3
+"""
+Precompile the SymSpell dictionary for fast normalizer startup
+--------------------------------------------------------------
+Reads   : data/frequency_dictionary_en_82_765.txt
+Creates : data/symspell_snapshot.bin  (stamped with dictionary hash + params)
+
+preprocessing.text_normalizer loads the snapshot at import time and falls
+back to the text dictionary whenever the stamp no longer matches.
+"""
+
+import pathlib, sys, time
+
+SCRIPT_DIR   = pathlib.Path(__file__).resolve().parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from preprocessing import text_normalizer as tn    # noqa: E402
+
+t0 = time.perf_counter()
+meta = tn.build_snapshot()
+out = pathlib.Path(tn.SNAPSHOT_PATH).resolve()
+print(f"[✓] Snapshot written → {out.relative_to(PROJECT_ROOT)}  "
+      f"({out.stat().st_size / 1e6:.1f} MB, {time.perf_counter() - t0:.1f}s)")
+print(f"    dictionary sha256 {meta['dictionary_sha256'][:12]}…  "
+      f"edit distance {meta['max_edit_distance']}, prefix {meta['prefix_length']}")
@@ -5,21 +5,15 @@ import pandas as pd
 from datasets import load_dataset
 from bs4 import BeautifulSoup
 
-# Helper functions (safe_strip, clean_html, inspect_dataset) remain the same.
+from parallel_parse import needs_html_cleaning, parse_and_clean, safe_strip
 
-def safe_strip(text):
-    if text is None:
-        return ""
-    if not isinstance(text, str):
-        try:
-            text = str(text)
-        except:
-            return ""
-    return text.strip()
+# Helper functions (clean_html, inspect_dataset) remain the same.
 
 def clean_html(raw_text):
     if raw_text is None:
         return ""
+    if not needs_html_cleaning(raw_text):
+        return raw_text.strip()  # nothing for BeautifulSoup to remove
     soup = BeautifulSoup(raw_text, "html.parser")
     text = soup.get_text(separator=" ")
     return html.unescape(text).strip()
@@ -126,22 +120,7 @@ def process_hf_dataset(hf_name: str, parser_fn, multi_pair: bool=False, split: s
     else:
         ds_part = ds
     inspect_dataset(ds_part, num_examples=2)
-    all_pairs = []
-    for example in ds_part:
-        try:
-            if multi_pair:
-                pairs = parser_fn(example)
-                for u, b in pairs:
-                    u2, b2 = safe_strip(u), safe_strip(b)
-                    if u2:
-                        all_pairs.append((clean_html(u2), clean_html(b2)))
-            else:
-                u, b = parser_fn(example)
-                u2, b2 = safe_strip(u), safe_strip(b)
-                if u2:
-                    all_pairs.append((clean_html(u2), clean_html(b2)))
-        except Exception:
-            continue
+    all_pairs = parse_and_clean(ds_part, parser_fn, clean_html, multi_pair=multi_pair)
     if not all_pairs:
         print(f"[Info] No pairs extracted for {hf_name} (check parser).")
     else:
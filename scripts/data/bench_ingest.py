@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Benchmark the ingestion parse + clean stage
+-------------------------------------------
+Builds counsel-chat style examples from the Final_Datasets CSVs (every
+--html-every'th row wrapped in HTML with entities, like the raw sources) and
+times three variants:
+
+  serial        the original loop: BeautifulSoup on every field
+  fast path     same loop, BeautifulSoup only for fields with '<' or '&'
+  pool          parallel_parse.parse_and_clean (fast path + process pool)
+
+All three must yield identical pairs.
+
+Usage:
+    python "scripts/data/bench_ingest.py" --rows 200000 --workers 8
+"""
+
+import argparse, glob, html, itertools, os, pathlib, sys, time
+
+import pandas as pd
+from bs4 import BeautifulSoup
+
+SCRIPT_DIR = pathlib.Path(__file__).resolve().parent
+sys.path.insert(0, str(SCRIPT_DIR))
+
+from parallel_parse import needs_html_cleaning, parse_and_clean, safe_strip  # noqa: E402
+
+
+def parse_counsel_chat(example):
+    return safe_strip(example.get("questionText")), safe_strip(example.get("answerText"))
+
+
+def clean_html_original(raw_text):
+    if raw_text is None:
+        return ""
+    soup = BeautifulSoup(raw_text, "html.parser")
+    return html.unescape(soup.get_text(separator=" ")).strip()
+
+
+def clean_html_fast(raw_text):
+    if raw_text is None:
+        return ""
+    if not needs_html_cleaning(raw_text):
+        return raw_text.strip()
+    return clean_html_original(raw_text)
+
+
+def serial(examples, clean_fn):
+    pairs = []
+    for example in examples:
+        u, b = parse_counsel_chat(example)
+        u2, b2 = safe_strip(u), safe_strip(b)
+        if u2:
+            pairs.append((clean_fn(u2), clean_fn(b2)))
+    return pairs
+
+
+def build_examples(rows, html_every):
+    frames = [pd.read_csv(p, dtype=str, keep_default_na=False)
+              for p in sorted(glob.glob(str(SCRIPT_DIR / "Final_Datasets" / "*.csv")))]
+    base = pd.concat(frames)[["user", "bot"]].values.tolist()
+    examples = []
+    for i, (q, a) in enumerate(itertools.islice(itertools.cycle(base), rows)):
+        if html_every and i % html_every == 0:
+            a = f"<p>{html.escape(a)}</p><br/>&nbsp;"
+        examples.append({"questionText": q, "answerText": a})
+    return examples
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--rows", type=int, default=50_000)
+    ap.add_argument("--html-every", type=int, default=5, help="wrap every Nth answer in HTML (0 = never)")
+    ap.add_argument("--workers", type=int, default=os.cpu_count())
+    args = ap.parse_args()
+
+    examples = build_examples(args.rows, args.html_every)
+    print(f"[+] {len(examples)} examples, {args.workers} worker(s)")
+
+    results = {}
+    for name, run in (("serial", lambda: serial(examples, clean_html_original)),
+                      ("fast path", lambda: serial(examples, clean_html_fast)),
+                      ("pool", lambda: parse_and_clean(examples, parse_counsel_chat, clean_html_fast,
+                                                       workers=args.workers))):
+        t0 = time.perf_counter()
+        results[name] = run()
+        dt = time.perf_counter() - t0
+        print(f"[=] {name:<10} {len(examples) / dt:>10,.0f} rows/s  ({dt:.2f}s)")
+
+    if not all(r == results["serial"] for r in results.values()):
+        sys.exit("❌ variants disagree")
+    print("[✓] identical output")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Columnar (Parquet) cache of the Final_Datasets CSVs
+---------------------------------------------------
+One-time conversion of every CSV in Final_Datasets to a single Parquet file
+with the standard schema:
+
+    context    string   stripped user text
+    response   string   stripped bot text
+    source     string   CSV file stem (dictionary encoded)
+    source_row int64    0-based data row in that CSV (provenance)
+
+Rows with an empty context or response are dropped, as the merge does. Each
+CSV is written as its own row groups, so a filter on `source` skips whole
+row groups, and readers that ask only for `context` never decode `response`.
+
+Downstream scripts use load() / iter_batches():
+
+    from columnar_cache import load
+    df = load(columns=["context"], sources=["tolu07_Mental_Health_FAQ"])
+
+The cache is rebuilt when a CSV is newer than it, when CSVs were added,
+removed or renamed since it was built (the file list is stored in the
+Parquet metadata), or with --rebuild.
+Needs pyarrow.
+
+Usage:
+    python "scripts/data/columnar_cache.py" [--rebuild]
+"""
+
+import argparse, json, pathlib, sys, time
+
+import pandas as pd
+
+SCRIPT_DIR = pathlib.Path(__file__).resolve().parent
+SOURCES_DIR = SCRIPT_DIR / "Final_Datasets"
+CACHE_FILE = SCRIPT_DIR / "cache" / "final_datasets.parquet"
+
+# Column pairs recognised as (context, response), matched case-insensitively
+SCHEMA_OPTIONS = [
+    ("user", "bot"),
+    ("context", "response"),
+    ("question", "answer"),
+    ("prompt", "completion"),
+]
+# CSV rows read per chunk (and at most this many rows per Parquet row group)
+CHUNK_ROWS = 50_000
+# Rows per record batch handed out by iter_batches()
+BATCH_ROWS = 10_000
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow, pyarrow.parquet  # noqa: F401
+    except ImportError:
+        sys.exit("❌ The columnar cache needs pyarrow: pip install pyarrow")
+    return pyarrow
+
+
+def available():
+    """True if pyarrow is importable and the cache is built and up to date."""
+    try:
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        return False
+    return CACHE_FILE.exists() and not is_stale()
+
+
+def _source_names(sources_dir):
+    return sorted(p.name for p in sources_dir.glob("*.csv"))
+
+
+def is_stale(sources_dir=SOURCES_DIR, cache_file=CACHE_FILE):
+    if not cache_file.exists():
+        return True
+    built = cache_file.stat().st_mtime
+    if any(p.stat().st_mtime > built for p in sources_dir.glob("*.csv")):
+        return True
+    try:
+        import pyarrow.parquet as pq
+        metadata = pq.read_schema(cache_file).metadata or {}
+    except ImportError:
+        return True
+    return json.loads(metadata.get(b"sources", b"null")) != _source_names(sources_dir)
+
+
+def detect_mapping(columns):
+    """(context column, response column) per SCHEMA_OPTIONS, or None."""
+    cols_lower = {col.lower(): col for col in columns}
+    for ctx_col, resp_col in SCHEMA_OPTIONS:
+        if ctx_col in cols_lower and resp_col in cols_lower:
+            return cols_lower[ctx_col], cols_lower[resp_col]
+    return None
+
+
+def _schema(pa):
+    return pa.schema([
+        ("context", pa.string()),
+        ("response", pa.string()),
+        ("source", pa.dictionary(pa.int32(), pa.string())),
+        ("source_row", pa.int64()),
+    ])
+
+
+def build(sources_dir=SOURCES_DIR, cache_file=CACHE_FILE, chunk_rows=CHUNK_ROWS):
+    """Convert every CSV in `sources_dir` into `cache_file`; returns rows written per source."""
+    pa = _require_pyarrow()
+    import pyarrow.parquet as pq
+
+    schema = _schema(pa)
+    file_schema = schema.with_metadata({"sources": json.dumps(_source_names(sources_dir))})
+    cache_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp = cache_file.with_suffix(".tmp")
+    counts = {}
+    with pq.ParquetWriter(tmp, file_schema, compression="zstd") as writer:
+        for path in sorted(sources_dir.glob("*.csv")):
+            mapping = detect_mapping(pd.read_csv(path, nrows=0).columns)
+            if mapping is None:
+                print(f"[Skipping] {path.name}: no matching schema.")
+                continue
+            real_ctx, real_resp = mapping
+            source = path.stem
+            counts[source] = 0
+            offset = 0
+            for chunk in pd.read_csv(path, usecols=[real_ctx, real_resp], dtype=str,
+                                     keep_default_na=False, chunksize=chunk_rows):
+                frame = pd.DataFrame({
+                    "context": chunk[real_ctx].str.strip(),
+                    "response": chunk[real_resp].str.strip(),
+                    "source": source,
+                    "source_row": range(offset, offset + len(chunk)),
+                })
+                offset += len(chunk)
+                frame = frame[(frame["context"].str.len() > 0) & (frame["response"].str.len() > 0)]
+                if len(frame):
+                    writer.write_table(pa.Table.from_pandas(frame, schema=schema, preserve_index=False))
+                    counts[source] += len(frame)
+    tmp.replace(cache_file)
+    return counts
+
+
+def _filters(sources, filters):
+    """pyarrow filter list: `filters` AND-ed with source membership."""
+    out = list(filters or [])
+    if sources is not None:
+        out.append(("source", "in", list(sources)))
+    return out or None
+
+
+def load(columns=None, sources=None, filters=None, cache_file=CACHE_FILE):
+    """DataFrame of the cache, reading only `columns` and the row groups that pass the filters.
+
+    `filters` uses pyarrow's [(column, op, value), ...] form; `sources` is a
+    shorthand for ("source", "in", sources).
+    """
+    _require_pyarrow()
+    import pyarrow.parquet as pq
+
+    table = pq.read_table(cache_file, columns=columns, filters=_filters(sources, filters))
+    return table.to_pandas()
+
+
+def iter_batches(columns=None, sources=None, filters=None, batch_size=BATCH_ROWS, cache_file=CACHE_FILE):
+    """Stream the cache as pyarrow RecordBatches; memory stays at about one batch."""
+    _require_pyarrow()
+    import pyarrow.dataset as ds
+
+    dataset = ds.dataset(cache_file, format="parquet")
+    expr = None
+    for col, op, value in _filters(sources, filters) or []:
+        field = ds.field(col)
+        term = {"==": field == value, "!=": field != value, "<": field < value, "<=": field <= value,
+                ">": field > value, ">=": field >= value, "in": field.isin(value)}[op]
+        expr = term if expr is None else expr & term
+    yield from dataset.to_batches(columns=columns, filter=expr, batch_size=batch_size)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--rebuild", action="store_true", help="rebuild even if the cache is up to date")
+    args = ap.parse_args()
+
+    if not args.rebuild and not is_stale():
+        print(f"[=] Cache up to date: {CACHE_FILE}")
+        return
+    t0 = time.perf_counter()
+    counts = build()
+    for source, n in counts.items():
+        print(f"[+] {source}: {n} rows")
+    size_mb = CACHE_FILE.stat().st_size / 1e6
+    print(f"[✓] {sum(counts.values())} rows → {CACHE_FILE} ({size_mb:.1f} MB, {time.perf_counter() - t0:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -17,6 +17,9 @@ import pandas as pd
 # For HTML tag removal
 from bs4 import BeautifulSoup
 
+# Process-pool parse + clean shared with adddata.py
+from parallel_parse import needs_html_cleaning, parse_and_clean, safe_strip
+
 # For Kaggle API (optional)
 try:
     from kaggle.api.kaggle_api_extended import KaggleApi
@@ -28,25 +31,15 @@ except ImportError:
 OUTPUT_DIR = "dataset"
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
-def safe_strip(text):
-    """
-    Safely strip whitespace. If None or not string, return empty string.
-    """
-    if text is None:
-        return ""
-    if not isinstance(text, str):
-        try:
-            text = str(text)
-        except:
-            return ""
-    return text.strip()
-
 def clean_html(raw_text):
     """
     Remove HTML tags and unescape HTML entities.
     """
     if raw_text is None:
         return ""
+    # Fast path: plain text comes out of BeautifulSoup + unescape unchanged
+    if not needs_html_cleaning(raw_text):
+        return raw_text.strip()
     # Use BeautifulSoup to remove tags
     soup = BeautifulSoup(raw_text, "html.parser")
     text = soup.get_text(separator=" ")
@@ -244,30 +237,8 @@ def process_hf_dataset(hf_name: str, parser_fn, multi_pair: bool=False, split: s
 
     inspect_dataset(ds_part, num_examples=2)
 
-    all_pairs = []
-    for example in ds_part:
-        try:
-            if multi_pair:
-                pairs = parser_fn(example)
-                for u, b in pairs:
-                    u2, b2 = safe_strip(u), safe_strip(b)
-                    if u2:
-                        all_pairs.append((u2, b2))
-            else:
-                u, b = parser_fn(example)
-                u2, b2 = safe_strip(u), safe_strip(b)
-                if u2:
-                    all_pairs.append((u2, b2))
-        except Exception as e:
-            # Skip problematic example
-            continue
-
-    # Clean text further if desired; e.g., remove HTML
-    cleaned_pairs = []
-    for u, b in all_pairs:
-        cu = clean_html(u)
-        cb = clean_html(b)
-        cleaned_pairs.append((cu, cb))
+    # Parse + remove HTML on a process pool, in chunks (order preserved)
+    cleaned_pairs = parse_and_clean(ds_part, parser_fn, clean_html, multi_pair=multi_pair)
 
     # Save
     dataset_name_sanitized = hf_name.replace("/", "_").replace("-", "_")
@@ -310,16 +281,7 @@ def process_kaggle_dataset(kaggle_dataset_identifier: str, local_file: str, pars
         return
     print(f"Inspecting Kaggle DataFrame columns: {df.columns.tolist()}")
     # 3) Parse rows
-    pairs = []
-    for _, row in df.iterrows():
-        example = row.to_dict()
-        try:
-            u, b = parser_fn(example)
-            u2, b2 = safe_strip(u), safe_strip(b)
-            if u2:
-                pairs.append((clean_html(u2), clean_html(b2)))
-        except:
-            continue
+    pairs = parse_and_clean(df.to_dict(orient="records"), parser_fn, clean_html)
     # Save
     dataset_name_sanitized = kaggle_dataset_identifier.replace("/", "_").replace("-", "_")
     filename = f"{dataset_name_sanitized}.csv"
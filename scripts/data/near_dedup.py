@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Near-duplicate removal for merged training JSONL (MinHash + LSH)
+----------------------------------------------------------------
+Streams one or more JSONL files (e.g. train.jsonl then valid.jsonl from
+"processing all datasets.py"). Each record's text is shingled into word
+n-grams and summarised by a MinHash signature. LSH bands bucket the
+signatures, so a record is only compared with the few earlier records that
+share a bucket. A record whose estimated Jaccard similarity to an earlier
+kept record reaches --threshold is dropped; the first occurrence wins. Files
+are processed in the order given, so validation rows that near-duplicate
+training rows are removed too.
+
+Memory grows with the number of kept records (band keys + signatures), not
+with the text. --no-verify drops the stored signatures and trusts the LSH
+band match alone, for very large corpora.
+
+Writes <file>.near_dedup.jsonl next to each input and prints, per source
+dataset, how many records were removed and how many clusters they formed.
+
+Usage:
+    python "scripts/data/near_dedup.py" train.jsonl valid.jsonl --threshold 0.8
+"""
+
+import argparse, collections, json, pathlib, re, time, zlib
+
+import numpy as np
+
+# Similarity above which two records count as near-duplicates
+THRESHOLD = 0.8
+# Hash permutations per signature
+NUM_PERM = 128
+# Words per shingle
+SHINGLE_WORDS = 3
+
+_MERSENNE = np.uint64((1 << 31) - 1)
+_WORD = re.compile(r"\w+")
+
+
+def lsh_params(threshold, num_perm):
+    """(bands, rows) whose S-curve midpoint (1/b)^(1/r) is closest to `threshold`."""
+    best = None
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        midpoint = (1 / bands) ** (1 / rows)
+        if best is None or abs(midpoint - threshold) < best[0]:
+            best = (abs(midpoint - threshold), bands, rows)
+    return best[1], best[2]
+
+
+class MinHasher:
+    def __init__(self, num_perm=NUM_PERM, shingle_words=SHINGLE_WORDS, seed=1):
+        rng = np.random.RandomState(seed)
+        self.a = rng.randint(1, int(_MERSENNE), size=num_perm, dtype=np.uint64)
+        self.b = rng.randint(0, int(_MERSENNE), size=num_perm, dtype=np.uint64)
+        self.shingle_words = shingle_words
+
+    def shingles(self, text):
+        words = _WORD.findall(text.lower())
+        k = self.shingle_words
+        if len(words) <= k:
+            return {" ".join(words)}
+        return {" ".join(words[i:i + k]) for i in range(len(words) - k + 1)}
+
+    def signature(self, text):
+        hashed = np.fromiter((zlib.crc32(s.encode()) for s in self.shingles(text)), dtype=np.uint64)
+        hashed %= _MERSENNE
+        # (a*x + b) mod p for every permutation x shingle; a, x < 2^31 so no uint64 overflow
+        return ((np.outer(self.a, hashed) + self.b[:, None]) % _MERSENNE).min(axis=1).astype(np.uint32)
+
+
+class NearDuplicateIndex:
+    def __init__(self, threshold=THRESHOLD, num_perm=NUM_PERM, verify=True):
+        self.threshold = threshold
+        self.bands, self.rows = lsh_params(threshold, num_perm)
+        self.tables = [dict() for _ in range(self.bands)]  # band key -> kept record id
+        self.verify = verify
+        self.signatures = []  # kept record id -> signature (only with verify)
+        self.kept = 0
+
+    def _band_keys(self, sig):
+        r = self.rows
+        return [hash(sig[i * r:(i + 1) * r].tobytes()) for i in range(self.bands)]
+
+    def query_insert(self, sig):
+        """Return the id of a kept near-duplicate, or None after storing `sig` as kept."""
+        keys = self._band_keys(sig)
+        for table, key in zip(self.tables, keys):
+            match = table.get(key)
+            if match is None:
+                continue
+            if not self.verify or np.mean(self.signatures[match] == sig) >= self.threshold:
+                return match
+        if self.verify:
+            self.signatures.append(sig)
+        for table, key in zip(self.tables, keys):
+            table.setdefault(key, self.kept)
+        self.kept += 1
+        return None
+
+
+def record_text(rec, field):
+    if field == "both":
+        return f"{rec.get('context', '')} {rec.get('response', '')}"
+    return rec.get(field, "")
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("inputs", nargs="+", type=pathlib.Path)
+    ap.add_argument("--threshold", type=float, default=THRESHOLD, help="Jaccard similarity to count as duplicate")
+    ap.add_argument("--num-perm", type=int, default=NUM_PERM)
+    ap.add_argument("--shingle-words", type=int, default=SHINGLE_WORDS)
+    ap.add_argument("--field", choices=("both", "context", "response"), default="both",
+                    help="text compared between records")
+    ap.add_argument("--no-verify", action="store_true",
+                    help="skip the signature check after an LSH match (less memory, more false positives)")
+    args = ap.parse_args()
+
+    hasher = MinHasher(args.num_perm, args.shingle_words)
+    index = NearDuplicateIndex(args.threshold, args.num_perm, verify=not args.no_verify)
+    print(f"[+] threshold {args.threshold}, {args.num_perm} permutations = {index.bands} bands x {index.rows} rows")
+
+    kept_source = []                          # kept record id -> source
+    totals = collections.Counter()            # source -> records read
+    removed = collections.Counter()           # source -> records removed
+    clusters = collections.defaultdict(set)   # source -> kept ids its removed records matched
+    cross = collections.Counter()             # (removed source, kept source) -> count
+    t0 = time.perf_counter()
+
+    for path in args.inputs:
+        out_path = path.with_suffix(".near_dedup.jsonl")
+        with open(path, encoding="utf-8") as fin, open(out_path, "w", encoding="utf-8") as fout:
+            for line in fin:
+                if not line.strip():
+                    continue
+                rec = json.loads(line)
+                source = rec.get("source", path.stem)
+                totals[source] += 1
+                match = index.query_insert(hasher.signature(record_text(rec, args.field)))
+                if match is None:
+                    kept_source.append(source)
+                    fout.write(line if line.endswith("\n") else line + "\n")
+                else:
+                    removed[source] += 1
+                    clusters[source].add(match)
+                    cross[(source, kept_source[match])] += 1
+        print(f"[+] {path} → {out_path}")
+
+    n_total, n_removed = sum(totals.values()), sum(removed.values())
+    dt = time.perf_counter() - t0
+    print(f"[=] {n_total} records, {n_removed} near-duplicates removed "
+          f"({n_total / max(dt, 1e-9):,.0f} records/s)")
+    print(f"    {'source':<55} {'read':>7} {'removed':>8} {'clusters':>9}")
+    for source in sorted(totals):
+        print(f"    {source:<55} {totals[source]:>7} {removed[source]:>8} {len(clusters[source]):>9}")
+    if cross:
+        print("    removed → kept-in source:")
+        for (src, dst), n in cross.most_common():
+            print(f"      {src} → {dst}: {n}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Parallel parse + clean for the dataset ingestion scripts (data.py, adddata.py)
+
+parse_and_clean(examples, parser_fn, clean_fn, multi_pair) runs the
+per-row parser and the HTML cleaner over a process pool, CHUNK_SIZE examples
+per task, and returns the cleaned (user, bot) pairs in input order – the
+same list the old single-threaded loop produced. parser_fn / clean_fn must be
+module-level functions so they can be sent to the workers.
+"""
+
+import itertools
+import os
+from multiprocessing import Pool
+
+# Examples per task sent to a worker
+CHUNK_SIZE = 2_000
+# Worker processes (None = one per CPU)
+WORKERS = None
+# Below this many examples the pool start-up costs more than it saves
+MIN_PARALLEL = 5_000
+
+
+def safe_strip(text):
+    """
+    Safely strip whitespace. If None or not string, return empty string.
+    """
+    if text is None:
+        return ""
+    if not isinstance(text, str):
+        try:
+            text = str(text)
+        except (TypeError, AttributeError):
+            return ""
+    return text.strip()
+
+
+def needs_html_cleaning(text):
+    """Only text with a tag or an entity can change under BeautifulSoup + unescape."""
+    return "<" in text or "&" in text
+
+
+def _parse_chunk(task):
+    parser_fn, clean_fn, multi_pair, examples = task
+    pairs = []
+    for example in examples:
+        try:
+            parsed = parser_fn(example) if multi_pair else [parser_fn(example)]
+            for u, b in parsed:
+                u2, b2 = safe_strip(u), safe_strip(b)
+                if u2:
+                    pairs.append((clean_fn(u2), clean_fn(b2)))
+        except Exception:
+            # Skip problematic example
+            continue
+    return pairs
+
+
+def _chunks(examples, size):
+    it = iter(examples)
+    while True:
+        chunk = list(itertools.islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def parse_and_clean(examples, parser_fn, clean_fn, multi_pair=False,
+                    workers=WORKERS, chunk_size=CHUNK_SIZE):
+    """Cleaned (user, bot) pairs of `examples`, in order, parsed on a process pool."""
+    try:
+        total = len(examples)
+    except TypeError:
+        total = None
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or (total is not None and total < MIN_PARALLEL):
+        return _parse_chunk((parser_fn, clean_fn, multi_pair, examples))
+
+    tasks = ((parser_fn, clean_fn, multi_pair, chunk) for chunk in _chunks(examples, chunk_size))
+    pairs = []
+    with Pool(workers) as pool:
+        for chunk_pairs in pool.imap(_parse_chunk, tasks):  # imap keeps input order
+            pairs.extend(chunk_pairs)
+    return pairs
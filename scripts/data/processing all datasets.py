@@ -1,7 +1,10 @@
 import os
-import pandas as pd
+import hashlib
 import json
-import random
+import numpy as np
+import pandas as pd
+
+import columnar_cache
 
 # === Configuration ===
 # Determine the directory of this script and locate 'Final_Datasets' subfolder
@@ -24,80 +27,170 @@ default_csv_files = [
 # Output JSONL files (written to script directory)
 output_train = os.path.join(base_dir(), "train.jsonl")
 output_valid = os.path.join(base_dir(), "valid.jsonl")
+# Parquet copies of the split, written alongside when the columnar cache is used
+output_train_pq = os.path.join(base_dir(), "train.parquet")
+output_valid_pq = os.path.join(base_dir(), "valid.parquet")
 
 # Fraction of data reserved for validation
 split_ratio = 0.1
-# Random seed for reproducibility
+# Seed of the split hash: same seed, same split
 seed = 42
-
-# Possible column schema options (lowercase matching)
-schema_options = [
-    ("user", "bot"),
-    ("context", "response"),
-    ("question", "answer"),
-    ("prompt", "completion"),
-]
-
-records = []
-
-# 1) Load, detect schema, standardize each CSV
-for fname in default_csv_files:
-    path = os.path.join(data_dir, fname)
-    if not os.path.exists(path):
-        print(f"[Warning] File not found: {path}")
-        continue
-
-    try:
-        df = pd.read_csv(path)
-    except Exception as e:
-        print(f"[Error] Failed to read {path}: {e}")
-        continue
-
-    cols_lower = {col.lower(): col for col in df.columns}
-    mapping = None
-    for ctx_col, resp_col in schema_options:
-        if ctx_col in cols_lower and resp_col in cols_lower:
-            mapping = (cols_lower[ctx_col], cols_lower[resp_col])
-            break
-    if mapping is None:
-        print(f"[Skipping] {fname}: no matching schema. Columns: {list(df.columns)}")
-        continue
-
+# Hash buckets used for the split (a pair goes to validation if its bucket < split_ratio * buckets)
+split_buckets = 10_000
+# Rows read per chunk; memory use depends on this, not on the size of the sources
+chunk_rows = 5_000
+
+def pair_digest(context, response):
+    """64-bit keyed BLAKE2b digest of a pair: dedup key and split bucket in one."""
+    h = hashlib.blake2b(digest_size=8, key=str(seed).encode())
+    h.update(context.encode("utf-8"))
+    h.update(b"\x00")
+    h.update(response.encode("utf-8"))
+    return int.from_bytes(h.digest(), "big")
+
+
+def iter_pairs(path, mapping):
+    """Stream stripped, non-empty (context, response) pairs of one CSV, chunk by chunk."""
     real_ctx, real_resp = mapping
-    df = df[[real_ctx, real_resp]].rename(columns={real_ctx: "context", real_resp: "response"})
-
-    # 2) Clean: strip whitespace and drop empty entries
-    df["context"] = df["context"].astype(str).str.strip()
-    df["response"] = df["response"].astype(str).str.strip()
-    df = df[(df["context"].str.len() > 0) & (df["response"].str.len() > 0)]
-
-    # 3) Collect records
-    records.extend(df.to_dict(orient="records"))
-
-# 4) Deduplicate context–response pairs
-unique = {(r["context"], r["response"]): r for r in records}
-all_records = list(unique.values())
-
-# 5) Shuffle & split into train/validation
-random.seed(seed)
-random.shuffle(all_records)
-
-n_total = len(all_records)
-n_valid = int(n_total * split_ratio)
-valid_records = all_records[:n_valid]
-train_records = all_records[n_valid:]
-
-# 6) Write out JSONL files
-with open(output_train, "w", encoding="utf-8") as ft:
-    for rec in train_records:
-        ft.write(json.dumps(rec, ensure_ascii=False) + "\n")
-
-with open(output_valid, "w", encoding="utf-8") as fv:
-    for rec in valid_records:
-        fv.write(json.dumps(rec, ensure_ascii=False) + "\n")
-
-# 7) Summary log
+    for chunk in pd.read_csv(path, usecols=[real_ctx, real_resp], dtype=str,
+                             keep_default_na=False, chunksize=chunk_rows):
+        contexts = chunk[real_ctx].str.strip()
+        responses = chunk[real_resp].str.strip()
+        keep = (contexts.str.len() > 0) & (responses.str.len() > 0)
+        yield from zip(contexts[keep], responses[keep])
+
+
+class DigestSet:
+    """
+    Set of 64-bit digests stored in a sorted numpy.uint64 array.
+
+    Memory is O(unique pairs) at about 8 bytes each, plus a small Python set
+    of recent additions that is merged into the array once it holds
+    max(buffer_min, len(array) / 16) digests (so merges stay amortised).
+    """
+
+    def __init__(self, buffer_min=65_536):
+        self._sorted = np.empty(0, dtype=np.uint64)
+        self._recent = set()
+        self._buffer_min = buffer_min
+
+    def __contains__(self, digest):
+        if digest in self._recent:
+            return True
+        i = np.searchsorted(self._sorted, np.uint64(digest))
+        return i < len(self._sorted) and int(self._sorted[i]) == digest
+
+    def add(self, digest):
+        self._recent.add(digest)
+        if len(self._recent) >= max(self._buffer_min, len(self._sorted) // 16):
+            self._merge()
+
+    def _merge(self):
+        fresh = np.fromiter(self._recent, dtype=np.uint64, count=len(self._recent))
+        self._sorted = np.union1d(self._sorted, fresh)
+        self._recent.clear()
+
+
+def iter_cached_pairs(source):
+    """Same pairs as iter_pairs, read from the columnar cache (only this source's row groups)."""
+    for batch in columnar_cache.iter_batches(columns=["context", "response"], sources=[source],
+                                             batch_size=chunk_rows):
+        yield from zip(batch.column("context").to_pylist(), batch.column("response").to_pylist())
+
+
+class SplitParquet:
+    """Buffers split records and writes them to Parquet chunk_rows at a time."""
+
+    def __init__(self, path):
+        import pyarrow as pa, pyarrow.parquet as pq
+        self.pa = pa
+        self.schema = pa.schema([("context", pa.string()), ("response", pa.string()), ("source", pa.string())])
+        self.writer = pq.ParquetWriter(path, self.schema)
+        self.rows = []
+
+    def write(self, rec):
+        self.rows.append(rec)
+        if len(self.rows) >= chunk_rows:
+            self.flush()
+
+    def flush(self):
+        if self.rows:
+            self.writer.write_table(self.pa.Table.from_pylist(self.rows, schema=self.schema))
+            self.rows = []
+
+    def close(self):
+        self.flush()
+        self.writer.close()
+
+
+use_cache = columnar_cache.available()
+if use_cache:
+    print(f"[Cache] Reading sources from {columnar_cache.CACHE_FILE}")
+    pq_train, pq_valid = SplitParquet(output_train_pq), SplitParquet(output_valid_pq)
+else:
+    print("[Cache] Columnar cache missing or stale; parsing CSVs (build it with columnar_cache.py)")
+    # Parquet copies from an earlier cached run would now be out of date
+    for stale in (output_train_pq, output_valid_pq):
+        if os.path.exists(stale):
+            os.remove(stale)
+            print(f"[Cache] Removed stale {stale}")
+
+seen = DigestSet()  # 64-bit digests of every pair written so far
+valid_cutoff = int(split_ratio * split_buckets)
+n_train = n_valid = n_dupes = 0
+
+# 1) Stream each CSV: detect schema, clean, dedup, split and write as we go
+with open(output_train, "w", encoding="utf-8") as ft, open(output_valid, "w", encoding="utf-8") as fv:
+    for fname in default_csv_files:
+        path = os.path.join(data_dir, fname)
+        if not os.path.exists(path):
+            print(f"[Warning] File not found: {path}")
+            continue
+
+        source = os.path.splitext(fname)[0]
+        if use_cache:
+            pairs = iter_cached_pairs(source)
+        else:
+            try:
+                mapping = columnar_cache.detect_mapping(pd.read_csv(path, nrows=0).columns)
+            except Exception as e:
+                print(f"[Error] Failed to read {path}: {e}")
+                continue
+            if mapping is None:
+                print(f"[Skipping] {fname}: no matching schema.")
+                continue
+            pairs = iter_pairs(path, mapping)
+
+        kept = dupes = 0
+        for context, response in pairs:
+            digest = pair_digest(context, response)
+            if digest in seen:
+                dupes += 1
+                continue
+            seen.add(digest)
+            rec = {"context": context, "response": response, "source": source}
+            line = json.dumps(rec, ensure_ascii=False) + "\n"
+            # 2) Deterministic split: the pair's hash bucket decides, no shuffle needed
+            if digest % split_buckets < valid_cutoff:
+                fv.write(line)
+                n_valid += 1
+                if use_cache:
+                    pq_valid.write(rec)
+            else:
+                ft.write(line)
+                n_train += 1
+                if use_cache:
+                    pq_train.write(rec)
+            kept += 1
+        n_dupes += dupes
+        print(f"[Loaded] {fname}: {kept} pairs kept, {dupes} duplicates dropped")
+
+if use_cache:
+    pq_train.close()
+    pq_valid.close()
+
+# 3) Summary log
 print(f"Final datasets directory: {data_dir}")
-print(f"Total dialog pairs: {n_total}")
-print(f"Training examples: {len(train_records)} -> {output_train}")
-print(f"Validation examples: {len(valid_records)} -> {output_valid}")
\ No newline at end of file
+print(f"Total dialog pairs: {n_train + n_valid} ({n_dupes} duplicates dropped)")
+print(f"Training examples: {n_train} -> {output_train}")
+print(f"Validation examples: {n_valid} -> {output_valid}")
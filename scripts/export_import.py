@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Stream chat sessions and messages out of / into the database
+------------------------------------------------------------
+export  writes <dir>/sessions.<ext> and <dir>/messages.<ext>
+import  reads them back (ids preserved, rows already present are skipped)
+
+messages.<ext> includes the messages of archived sessions, unpacked; import
+puts them in the hot table, so run archive_sessions.py again afterwards to
+move them back to cold storage.
+
+Rows are read through a server-side cursor and written in fixed-size batches
+(executemany inside one transaction per batch), so memory stays flat no matter
+how large the tables are. Formats: gzip-compressed JSONL (default) or Parquet
+(needs pyarrow). The backend is MINDMATE_DB_BACKEND unless --backend is given.
+
+Usage:
+    python scripts/export_import.py export --out exports/2024-06
+    python scripts/export_import.py export --out exports/pq --format parquet
+    python scripts/export_import.py import --src exports/2024-06 --backend sqlite
+"""
+
+import argparse, gzip, json, pathlib, sys, time
+from datetime import datetime
+
+SCRIPT_DIR   = pathlib.Path(__file__).resolve().parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from database.storage import BACKENDS, BULK_BATCH, TABLE_COLUMNS, open_storage, resolve_backend  # noqa: E402
+
+# Parents before children so foreign keys hold during import
+TABLES = ("sessions", "messages")
+TIMESTAMP_COLUMNS = {"created_at", "timestamp"}
+EXTENSIONS = {"jsonl": ".jsonl.gz", "parquet": ".parquet"}
+# Arrow type per column: fixed up front, so a batch whose titles are all NULL
+# cannot pin the file's schema to the `null` type
+ARROW_TYPES = {"id": "int64", "session_id": "int64", "created_at": "timestamp[us]",
+               "timestamp": "timestamp[us]", "title": "string", "sender": "string", "content": "string"}
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow, pyarrow.parquet  # noqa: F401
+    except ImportError:
+        sys.exit("❌ Parquet needs pyarrow: pip install pyarrow")
+    return pyarrow
+
+
+# ── writers / readers: each handles one batch of tuples at a time ─────────
+class JsonlWriter:
+    def __init__(self, path, columns):
+        self.columns = columns
+        self._f = gzip.open(path, "wt", encoding="utf-8", compresslevel=6)
+
+    def write(self, rows):
+        for row in rows:
+            record = {c: (v.isoformat(" ") if isinstance(v, datetime) else v)
+                      for c, v in zip(self.columns, row)}
+            self._f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def close(self):
+        self._f.close()
+
+
+def read_jsonl(path, columns, batch_size):
+    batch = []
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            batch.append(tuple(datetime.fromisoformat(record[c]) if c in TIMESTAMP_COLUMNS and record[c]
+                               else record[c] for c in columns))
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+    if batch:
+        yield batch
+
+
+class ParquetWriter:
+    def __init__(self, path, columns):
+        pa = _require_pyarrow()
+        self.columns = columns
+        self._pa = pa
+        self._schema = pa.schema([(c, pa.type_for_alias(ARROW_TYPES[c])) for c in columns])
+        self._writer = pa.parquet.ParquetWriter(path, self._schema, compression="zstd")
+
+    def write(self, rows):
+        table = self._pa.Table.from_pydict({c: [row[i] for row in rows] for i, c in enumerate(self.columns)},
+                                           schema=self._schema)
+        self._writer.write_table(table)  # one row group per batch
+
+    def close(self):
+        self._writer.close()
+
+
+def read_parquet(path, columns, batch_size):
+    pa = _require_pyarrow()
+    for batch in pa.parquet.ParquetFile(path).iter_batches(batch_size=batch_size, columns=list(columns)):
+        yield list(zip(*(batch.column(c).to_pylist() for c in columns)))
+
+
+WRITERS = {"jsonl": JsonlWriter, "parquet": ParquetWriter}
+READERS = {"jsonl": read_jsonl, "parquet": read_parquet}
+
+
+def _report(table, rows, seconds):
+    print(f"[=] {table:<9} {rows:>10,} rows in {seconds:6.1f}s  ({rows / max(seconds, 1e-9):,.0f} rows/s)")
+
+
+def export(storage, out_dir, fmt, batch_size):
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for table in TABLES:
+        path = out_dir / f"{table}{EXTENSIONS[fmt]}"
+        writer = WRITERS[fmt](path, TABLE_COLUMNS[table])
+        rows, t0 = 0, time.perf_counter()
+        try:
+            for batch in storage.stream_table(table, batch_size):
+                writer.write(batch)
+                rows += len(batch)
+        finally:
+            writer.close()
+        _report(table, rows, time.perf_counter() - t0)
+        print(f"    → {path}")
+
+
+def import_(storage, src_dir, fmt, batch_size, skip_existing):
+    storage.init_schema()
+    for table in TABLES:
+        path = src_dir / f"{table}{EXTENSIONS[fmt]}"
+        if not path.exists():
+            print(f"❌ {path} not found – skipping {table}")
+            continue
+        rows, t0 = 0, time.perf_counter()
+        for batch in READERS[fmt](path, TABLE_COLUMNS[table], batch_size):
+            storage.insert_rows(table, batch, skip_existing=skip_existing)
+            rows += len(batch)
+        _report(table, rows, time.perf_counter() - t0)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = ap.add_subparsers(dest="command", required=True)
+    for name in ("export", "import"):
+        p = sub.add_parser(name)
+        p.add_argument("--backend", choices=sorted(BACKENDS), default=None)
+        p.add_argument("--sqlite-path", default=None)
+        p.add_argument("--format", choices=sorted(WRITERS), default="jsonl")
+        p.add_argument("--batch", type=int, default=BULK_BATCH, help="rows per round-trip")
+    sub.choices["export"].add_argument("--out", type=pathlib.Path, required=True)
+    sub.choices["import"].add_argument("--src", type=pathlib.Path, required=True)
+    sub.choices["import"].add_argument("--fail-on-existing", action="store_true",
+                                       help="error instead of skipping rows whose id already exists")
+    args = ap.parse_args()
+    if args.sqlite_path and resolve_backend(args.backend) != "sqlite":
+        ap.error(f"--sqlite-path only applies to the sqlite backend, not {resolve_backend(args.backend)}")
+
+    options = {"path": args.sqlite_path} if args.sqlite_path else {}
+    storage = open_storage(args.backend, **options)
+    try:
+        if args.command == "export":
+            export(storage, args.out, args.format, args.batch)
+        else:
+            import_(storage, args.src, args.format, args.batch, not args.fail_on_existing)
+    finally:
+        storage.close()
+    print("[✓] done")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,332 @@
+"""
+service.py – headless MindMate chat service (HTTP/JSON over asyncio)
+
+Endpoints (all JSON):
+    POST /sessions                     → {"session_id"}
+    POST /reply         {"session_id", "text"} → {"session_id", "reply"}
+    POST /reply/stream  {"session_id", "text"} → chunked NDJSON {"delta"} … {"done": true}
+    GET  /sessions/<id>/history        → {"session_id", "turns": [{"user", "bot"}, …]}
+    GET  /healthz                      → {"status", "in_flight", "capacity"}
+    GET  /metrics                      → text metrics snapshot
+    GET  /metrics.json                 → metrics.snapshot() + peak RSS
+
+Model inference runs on a bounded thread pool. Once `workers + queue_size`
+requests are in flight new ones get 503 + Retry-After instead of piling up.
+SIGINT/SIGTERM stop accepting connections, drain in-flight requests (up to
+--grace seconds) and shut the pool down.
+
+    python service.py --port 8080 --workers 2 --queue-size 16
+"""
+
+import argparse
+import asyncio
+import json
+import re
+import signal
+import sys
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from orchestrator import metrics, threads
+from orchestrator.logging_setup import bind, get_logger, new_request_id
+
+log = get_logger("service")
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8080
+DEFAULT_WORKERS = 2
+DEFAULT_QUEUE_SIZE = 16
+# Largest request body accepted (bytes)
+MAX_BODY = 64 * 1024
+# Seconds a keep-alive connection may sit idle
+IDLE_TIMEOUT = 30
+# Seconds to wait for in-flight requests on shutdown
+SHUTDOWN_GRACE = 30
+
+_HISTORY_PATH = re.compile(r"^/sessions/([^/]+)/history$")
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+")
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+            413: "Payload Too Large", 500: "Internal Server Error", 503: "Service Unavailable"}
+
+
+class HttpError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class ChatService:
+    def __init__(self, bot, workers=DEFAULT_WORKERS, queue_size=DEFAULT_QUEUE_SIZE, persist=False):
+        self.bot = bot
+        self.persist = persist
+        self.capacity = workers + queue_size
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="infer")
+        self.in_flight = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._server = None
+
+    # ── lifecycle ─────────────────────────────────────────────
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT, sock=None):
+        if sock is not None:
+            self._server = await asyncio.start_server(self._handle_connection, sock=sock)
+        else:
+            self._server = await asyncio.start_server(self._handle_connection, host, port)
+        addr = self._server.sockets[0].getsockname()
+        log.info("🚀 Serving on http://%s:%s", addr[0], addr[1])
+        return self._server
+
+    async def shutdown(self, grace=SHUTDOWN_GRACE):
+        log.info("🛑 Shutting down – draining %d in-flight request(s)", self.in_flight)
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout=grace)
+        except asyncio.TimeoutError:
+            log.warning("grace period elapsed with %d request(s) still running", self.in_flight)
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        log.info("✅ Shutdown complete")
+
+    # ── inference ────────────────────────────────────────────
+    async def _run(self, fn, *args):
+        """Run blocking work on the pool, rejecting when the queue is full."""
+        if self.in_flight >= self.capacity:
+            metrics.incr("rejected", "backpressure")
+            raise HttpError(503, "server busy, retry later")
+        self.in_flight += 1
+        self._idle.clear()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+        finally:
+            self.in_flight -= 1
+            if not self.in_flight:
+                self._idle.set()
+
+    def _new_session(self):
+        if self.persist:
+            from database.database_handler import create_session
+            return create_session()
+        return uuid.uuid4().hex
+
+    def _reply(self, session_id, text):
+        if self.persist:
+            from database.database_handler import queue_message
+            queue_message(session_id, "user", text)
+        reply = self.bot.get_reply(text, session_id=session_id)
+        if self.persist:
+            queue_message(session_id, "bot", reply)
+        return reply
+
+    # ── HTTP plumbing ────────────────────────────────────────
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(_read_request(reader), timeout=IDLE_TIMEOUT)
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+                    break
+                if request is None:
+                    break
+                method, path, headers, body = request
+                keep_alive = headers.get("connection", "").lower() != "close"
+                with bind(request_id=new_request_id()):
+                    await self._dispatch(method, path, body, writer)
+                if not keep_alive:
+                    break
+        except HttpError as e:
+            await _send_json(writer, e.status, {"error": str(e)}, close=True)
+        except Exception:
+            log.exception("connection handler failed")
+        finally:
+            writer.close()
+
+    async def _dispatch(self, method, path, body, writer):
+        try:
+            with metrics.stage("http_request"):
+                if path == "/reply/stream" and method == "POST":
+                    await self._stream_reply(_parse_json(body), writer)
+                    return
+                status, payload = await self._route(method, path, body)
+        except HttpError as e:
+            status, payload = e.status, {"error": str(e)}
+        except Exception as e:
+            log.exception("request %s %s failed", method, path)
+            status, payload = 500, {"error": str(e)}
+        if status == 200 and isinstance(payload, str):
+            await _send(writer, 200, payload.encode("utf-8"), "text/plain; charset=utf-8")
+        else:
+            await _send_json(writer, status, payload)
+
+    async def _route(self, method, path, body):
+        if path == "/healthz" and method == "GET":
+            return 200, {"status": "ok", "in_flight": self.in_flight, "capacity": self.capacity}
+        if path == "/metrics" and method == "GET":
+            return 200, metrics.snapshot_text()
+        if path == "/metrics.json" and method == "GET":
+            return 200, dict(metrics.snapshot(), peak_rss_kb=peak_rss_kb())
+        if path == "/sessions" and method == "POST":
+            return 200, {"session_id": await self._run(self._new_session)}
+        if path == "/reply" and method == "POST":
+            session_id, text = _reply_args(_parse_json(body))
+            with bind(session_id=session_id):
+                reply = await self._run(self._reply, session_id, text)
+            return 200, {"session_id": session_id, "reply": reply}
+        match = _HISTORY_PATH.match(path)
+        if match and method == "GET":
+            session_id = _coerce_id(match.group(1))
+            turns = await self._run(self.bot.get_history, session_id)
+            return 200, {"session_id": session_id, "turns": turns}
+        if path in ("/healthz", "/metrics", "/metrics.json", "/sessions", "/reply") or match:
+            raise HttpError(405, f"{method} not allowed on {path}")
+        raise HttpError(404, f"no route for {path}")
+
+    async def _stream_reply(self, payload, writer):
+        """
+        Chunked NDJSON stream of the reply, one sentence per chunk. The router
+        produces whole replies, so the first chunk arrives once inference ends.
+        """
+        session_id, text = _reply_args(payload)
+        with bind(session_id=session_id):
+            reply = await self._run(self._reply, session_id, text)
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/x-ndjson\r\n"
+                     b"Transfer-Encoding: chunked\r\n\r\n")
+        for sentence in _SENTENCE_SPLIT.split(reply):
+            await _write_chunk(writer, {"delta": sentence})
+        await _write_chunk(writer, {"done": True, "session_id": session_id})
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+
+# ── helpers ─────────────────────────────────────────────────
+def peak_rss_kb():
+    """Peak resident set size of this process in KiB (None where unsupported)."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == "darwin" else rss
+
+
+async def _read_request(reader):
+    line = await reader.readline()
+    if not line:
+        return None
+    try:
+        method, target, _version = line.decode("latin-1").split()
+    except ValueError:
+        raise HttpError(400, "malformed request line")
+    headers = {}
+    while True:
+        raw = await reader.readline()
+        if raw in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = raw.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    raw_length = headers.get("content-length", "") or "0"
+    if not (raw_length.isascii() and raw_length.isdigit()):  # rejects "-5", "abc", "1e3", "²"
+        raise HttpError(400, "invalid Content-Length")
+    length = int(raw_length)
+    if length > MAX_BODY:
+        raise HttpError(413, "request body too large")
+    body = await reader.readexactly(length) if length else b""
+    return method.upper(), target.split("?", 1)[0], headers, body
+
+
+def _parse_json(body):
+    try:
+        return json.loads(body or b"{}")
+    except ValueError:
+        raise HttpError(400, "body is not valid JSON")
+
+
+def _coerce_id(value):
+    """Database sessions are ints; service-minted ones are hex strings.
+
+    Only canonical integers are converted: "007" stays a string, not session 7.
+    """
+    value = str(value)
+    if value.isascii() and value.isdigit() and value == str(int(value)):
+        return int(value)
+    return value
+
+
+def _reply_args(payload):
+    if not isinstance(payload, dict):
+        raise HttpError(400, "body must be a JSON object")
+    text = payload.get("text", "")
+    if not isinstance(text, str) or not text.strip():
+        raise HttpError(400, "'text' is required and must be a string")
+    session_id = payload.get("session_id")
+    if session_id is None:
+        raise HttpError(400, "'session_id' is required (POST /sessions first)")
+    if isinstance(session_id, bool) or not isinstance(session_id, (int, str)):
+        raise HttpError(400, "'session_id' must be a string or an integer")
+    return _coerce_id(session_id), text.strip()
+
+
+async def _send(writer, status, body: bytes, content_type, close=False):
+    head = [f"HTTP/1.1 {status} {_REASONS.get(status, '')}",
+            f"Content-Type: {content_type}",
+            f"Content-Length: {len(body)}"]
+    if status == 503:
+        head.append("Retry-After: 1")
+    if close:
+        head.append("Connection: close")
+    writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
+    await writer.drain()
+
+
+async def _send_json(writer, status, payload, close=False):
+    await _send(writer, status, json.dumps(payload, ensure_ascii=False).encode("utf-8"),
+                "application/json", close=close)
+
+
+async def _write_chunk(writer, obj):
+    data = (json.dumps(obj, ensure_ascii=False) + "\n").encode("utf-8")
+    writer.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+    await writer.drain()
+
+
+async def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, workers=DEFAULT_WORKERS,
+                queue_size=DEFAULT_QUEUE_SIZE, persist=False, grace=SHUTDOWN_GRACE,
+                bot=None, sock=None):
+    """Run the service until SIGINT/SIGTERM, then drain and exit."""
+    if bot is None:
+        from chatbot_engine import MindMateBot, SessionManager, load_turns_from_db
+        bot = MindMateBot(SessionManager(loader=load_turns_from_db if persist else None))
+    service = ChatService(bot, workers=workers, queue_size=queue_size, persist=persist)
+    await service.start(host, port, sock=sock)
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except NotImplementedError:  # Windows
+            signal.signal(sig, lambda *_: loop.call_soon_threadsafe(stop.set))
+    await stop.wait()
+    await service.shutdown(grace)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Headless MindMate chat service")
+    ap.add_argument("--host", default=DEFAULT_HOST)
+    ap.add_argument("--port", type=int, default=DEFAULT_PORT)
+    ap.add_argument("--workers", type=int, default=0, help="inference threads (0 = from the thread profile)")
+    ap.add_argument("--thread-profile", choices=sorted(threads.PROFILES), default="concurrent")
+    ap.add_argument("--pin", action="store_true", help="pin the process to its CPU share")
+    ap.add_argument("--queue-size", type=int, default=DEFAULT_QUEUE_SIZE,
+                    help="requests allowed to wait for a worker before 503")
+    ap.add_argument("--persist", action="store_true", help="log sessions/messages to the database")
+    ap.add_argument("--grace", type=float, default=SHUTDOWN_GRACE)
+    args = ap.parse_args()
+    budget = threads.apply(args.thread_profile, pin=args.pin)  # before the models are imported
+    workers = args.workers or budget["inference_workers"]
+    asyncio.run(serve(args.host, args.port, workers, args.queue_size, args.persist, args.grace))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+import pathlib
+import sys
+
+# database/ has no __init__.py; put the project root on the path so `database.x` imports resolve
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
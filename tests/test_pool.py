@@ -0,0 +1,99 @@
+"""ConnectionPool: slots come back on every exit path, broken connections are dropped, waits time out."""
+
+import threading
+
+import pytest
+
+from database.pool import ConnectionPool, PoolTimeout
+
+
+class FakeConn:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class Broken(Exception):
+    pass
+
+
+def make_pool(**kwargs):
+    kwargs.setdefault("max_size", 2)
+    kwargs.setdefault("acquire_timeout", 0.2)
+    kwargs.setdefault("discard_on", (Broken,))
+    return ConnectionPool(FakeConn, **kwargs)
+
+
+def test_connection_reused():
+    pool = make_pool()
+    with pool.connection() as first:
+        pass
+    with pool.connection() as second:
+        pass
+    assert first is second
+    assert pool.stats()["created"] == 1
+
+
+def test_other_errors_release_the_connection():
+    pool = make_pool()
+    for _ in range(pool.max_size * 3):
+        with pytest.raises(ValueError):
+            with pool.connection():
+                raise ValueError("caller error")
+    stats = pool.stats()
+    assert stats["in_use"] == 0
+    assert stats["idle"] == 1
+    assert stats["discarded"] == 0
+
+
+def test_abandoned_generator_releases_the_connection():
+    pool = make_pool()
+
+    def stream():
+        with pool.connection():
+            yield 1
+            yield 2
+
+    rows = stream()
+    next(rows)
+    assert pool.stats()["in_use"] == 1
+    rows.close()                       # GeneratorExit inside the with block
+    assert pool.stats()["in_use"] == 0
+
+
+def test_discard_on_closes_the_connection():
+    pool = make_pool()
+    with pytest.raises(Broken):
+        with pool.connection() as conn:
+            raise Broken()
+    assert conn.closed
+    stats = pool.stats()
+    assert stats["size"] == 0
+    assert stats["discarded"] == 1
+    with pool.connection() as fresh:
+        assert fresh is not conn
+
+
+def test_timeout_when_exhausted_counts_wait():
+    pool = make_pool(max_size=1)
+    held = pool.acquire()
+    with pytest.raises(PoolTimeout):
+        pool.acquire(timeout=0.1)
+    stats = pool.stats()
+    assert stats["timeouts"] == 1
+    assert stats["waits"] == 1
+    assert stats["wait_ms"] >= 90
+    pool.release(held)
+
+
+def test_waiter_gets_released_connection():
+    pool = make_pool(max_size=1, acquire_timeout=2.0)
+    held = pool.acquire()
+    got = []
+    waiter = threading.Thread(target=lambda: got.append(pool.acquire()))
+    waiter.start()
+    threading.Timer(0.05, pool.release, args=(held,)).start()
+    waiter.join(timeout=2.0)
+    assert got == [held]
@@ -0,0 +1,114 @@
+"""
+Behaviour every storage backend must share, run against each one.
+
+SQLite runs on a temporary file. MySQL runs only when MINDMATE_TEST_MYSQL_DB
+names a scratch database (connection settings from MINDMATE_DB_*); its tables
+are dropped afterwards, so never point it at real data.
+"""
+
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+from database import storage as storage_mod
+
+BACKEND_PARAMS = [
+    "sqlite",
+    pytest.param("mysql", marks=pytest.mark.skipif(not os.environ.get("MINDMATE_TEST_MYSQL_DB"),
+                                                   reason="MINDMATE_TEST_MYSQL_DB not set")),
+]
+
+
+@pytest.fixture(params=BACKEND_PARAMS)
+def storage(request, tmp_path):
+    if request.param == "sqlite":
+        store = storage_mod.open_storage("sqlite", path=str(tmp_path / "test.sqlite3"))
+    else:
+        pytest.importorskip("pymysql")
+        config = dict(storage_mod.DB_CONFIG, database=os.environ["MINDMATE_TEST_MYSQL_DB"])
+        store = storage_mod.open_storage("mysql", config=config)
+    store.init_schema()
+    yield store
+    if request.param == "mysql":
+        with store.cursor() as cur:
+            for table in ("archived_sessions", "messages", "sessions"):
+                cur.execute(f"DROP TABLE IF EXISTS {table}")
+    store.close()
+
+
+def _log_numbered(storage, sid, count=10):
+    base = datetime.now().replace(microsecond=0)
+    storage.log_messages_bulk([(sid, "bot" if i % 2 else "user", f"m{i}", base + timedelta(seconds=i))
+                               for i in range(count)])
+    return base
+
+
+def test_titles(storage):
+    sid = storage.create_session()
+    assert storage.get_session_title(sid) is None
+    assert storage.set_title_if_missing(sid, "first") is True
+    assert storage.set_title_if_missing(sid, "second") is False
+    assert storage.get_session_title(sid) == "first"
+    storage.update_session_title(sid, "renamed")
+    assert storage.get_session_title(sid) == "renamed"
+    sessions = storage.fetch_sessions_page(limit=1)
+    assert sessions[0][:2] == (sid, "renamed")
+
+
+def test_bulk_insert_and_fetch(storage):
+    sid = storage.create_session()
+    storage.log_message(sid, "user", "hello")
+    _log_numbered(storage, sid)
+    full = storage.fetch_messages(sid)
+    assert len(full) == 11
+    assert full[0] == ("user", "hello")
+    assert full[-1] == ("bot", "m9")
+
+
+def test_keyset_pages(storage):
+    sid = storage.create_session()
+    _log_numbered(storage, sid)
+    page = storage.fetch_messages_page(sid, limit=4)
+    assert [m[2] for m in page] == ["m6", "m7", "m8", "m9"]
+    older = storage.fetch_messages_page(sid, limit=4, before=(page[0][3], page[0][0]))
+    assert [m[2] for m in older] == ["m2", "m3", "m4", "m5"]
+    newer = storage.fetch_messages_page(sid, limit=2, after=(older[-1][3], older[-1][0]))
+    assert [m[2] for m in newer] == ["m6", "m7"]
+
+
+def test_failed_batch_rolls_back(storage):
+    sid = storage.create_session()
+    base = _log_numbered(storage, sid)
+    with pytest.raises(Exception):
+        storage.log_messages_bulk([(sid, "user", "kept?", base), (sid, "nobody", "bad", base)])
+    assert len(storage.fetch_messages(sid)) == 10
+
+
+def test_search(storage):
+    sid = storage.create_session()
+    _log_numbered(storage, sid)
+    storage.log_message(sid, "user", "I keep having panic attacks before exams")
+    hits = storage.search_messages("panic exams")
+    assert hits and hits[0][0] == sid and hits[0][3] == "user"
+    assert storage_mod.HIGHLIGHT[0] in hits[0][4]
+    assert storage.search_messages("panic exams", offset=len(hits)) == []
+
+
+def test_archive_round_trip(storage):
+    sid = storage.create_session()
+    _log_numbered(storage, sid)
+    before = storage.fetch_messages(sid)
+    assert storage.archive_sessions(older_than_days=-1, pause=0) == 1   # cutoff in the future: everything
+    exported = [row for batch in storage.stream_table("messages") for row in batch]
+    assert sorted(row[3] for row in exported) == sorted(content for _, content in before)
+    assert storage.fetch_messages(sid) == before
+
+
+def test_archive_again_merges_payload(storage):
+    sid = storage.create_session()
+    base = _log_numbered(storage, sid, count=4)
+    assert storage.archive_sessions(older_than_days=-1, pause=0) == 1
+    storage.log_messages_bulk([(sid, "user", "late", base + timedelta(seconds=30))])
+    assert storage.archive_sessions(older_than_days=-1, pause=0) == 1
+    assert [content for _, content in storage.fetch_messages(sid)] == ["m0", "m1", "m2", "m3", "late"]
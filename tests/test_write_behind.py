@@ -0,0 +1,103 @@
+"""MessageWriter: torn journal lines, poison rows and outages don't wedge the writer."""
+
+import json
+from datetime import datetime
+
+from database.write_behind import MessageWriter
+
+
+class FakeDB:
+    def __init__(self):
+        self.rows = []
+        self.up = True
+        self.reject = set()            # contents that always fail, like an FK violation
+
+    def write_rows(self, rows):
+        if not self.up:
+            raise ConnectionError("database down")
+        if any(r[2] in self.reject for r in rows):
+            raise ValueError("constraint violated")
+        self.rows.extend(rows)
+
+
+def make_writer(tmp_path, db, **kwargs):
+    kwargs.setdefault("flush_interval", 0.01)
+    return MessageWriter(db.write_rows, journal_path=str(tmp_path / "journal.jsonl"), **kwargs)
+
+
+def journal_line(content, session_id=1):
+    return json.dumps({"session_id": session_id, "sender": "user", "content": content,
+                       "timestamp": "2024-01-01T12:00:00.250000"}) + "\n"
+
+
+def test_torn_line_is_quarantined(tmp_path):
+    journal = tmp_path / "journal.jsonl"
+    journal.write_text(journal_line("kept") + '{"session_id": 1, "sen')
+    db = FakeDB()
+    writer = make_writer(tmp_path, db)
+    writer.enqueue(1, "user", "live")
+    assert writer.flush(timeout=2)
+    writer.close()
+    assert sorted(r[2] for r in db.rows) == ["kept", "live"]
+    assert not journal.exists()
+    assert (tmp_path / "journal.jsonl.dead").read_text().startswith('{"session_id": 1, "sen')
+
+
+def test_poison_row_is_dead_lettered(tmp_path):
+    db = FakeDB()
+    db.reject.add("bad")
+    writer = make_writer(tmp_path, db, max_attempts=3)
+    writer.enqueue(1, "user", "bad")
+    writer.enqueue(1, "user", "good")
+    assert writer.flush(timeout=2)
+    for i in range(4):
+        writer.enqueue(1, "user", f"later {i}")
+        assert writer.flush(timeout=2)
+    writer.close()
+    assert "good" in [r[2] for r in db.rows]
+    assert not (tmp_path / "journal.jsonl").exists()
+    dead = [json.loads(line) for line in (tmp_path / "journal.jsonl.dead").read_text().splitlines()]
+    assert [d["content"] for d in dead] == ["bad"]
+
+
+def test_outage_keeps_rows_without_charging_attempts(tmp_path):
+    db = FakeDB()
+    db.up = False
+    writer = make_writer(tmp_path, db, max_attempts=1)
+    for i in range(3):
+        writer.enqueue(1, "user", f"m{i}")
+        assert writer.flush(timeout=2)
+    writer.close()
+    assert not (tmp_path / "journal.jsonl.dead").exists()
+
+    db.up = True
+    writer = make_writer(tmp_path, db)
+    writer.enqueue(1, "user", "back")
+    assert writer.flush(timeout=2)
+    writer.close()
+    assert [r[2] for r in db.rows] == ["m0", "m1", "m2", "back"]   # replayed on start
+
+
+def test_timestamps_keep_microseconds(tmp_path):
+    db = FakeDB()
+    writer = make_writer(tmp_path, db)
+    writer.enqueue(1, "user", "now")
+    assert writer.flush(timeout=2)
+    writer.close()
+    assert isinstance(db.rows[0][3], datetime)
+    (tmp_path / "journal.jsonl").write_text(journal_line("old"))
+    writer = make_writer(tmp_path, db)
+    writer.enqueue(1, "user", "trigger")
+    assert writer.flush(timeout=2)
+    writer.close()
+    replayed = next(r for r in db.rows if r[2] == "old")
+    assert replayed[3].microsecond == 250000
+
+
+def test_close_does_not_block_on_full_queue_with_dead_thread(tmp_path):
+    db = FakeDB()
+    writer = make_writer(tmp_path, db, max_pending=1)
+    writer.close()
+    writer._closed = False
+    writer._queue.put_nowait(("x",))
+    writer.close(timeout=0.1)          # thread already stopped, queue full: returns